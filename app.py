@@ -1,40 +1,54 @@
-from dash import Dash, Input, Output, html, State,dcc
+from dash import Dash, Input, Output, html, State,dcc, ClientsideFunction, Patch
 import dash_bootstrap_components as dbc
 import pandas as pd
 from components.layout import layout
-from components.plots import create_plot
-from utils.helpers import (send_data_frame, get_selected_row_details,get_gene_details_from_csv,get_experiment_keys)
+from components.plots import plot_figure, recolor_plot
+from utils.helpers import (send_data_frame, get_selected_row_details,get_modal_table,get_experiment_keys,
+                           get_experiment_controls,get_modal_figure,modal_table_records,recompute_gene_growth,MODAL_TABLE_DECIMALS,
+                           relabel_table,snapshot_diff_columns,snapshot_diff_records,table_records,
+                           MODAL_FIGURE_BUILDERS)
+from utils.genelist import decode_upload, experiment_coverage, parse_gene_list, resolve_gene_list
+from utils.phenotypes import DEFAULT_THRESHOLDS, PHENOTYPES
+from utils.snapshots import load_snapshots
+from utils.singleflight import sessions
 import dash
 # Initialize the app
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
 app.title = "Barseq Data Explorer"
 server = app.server  # 👈 This line is crucial!
-# Load the dataset
+# Load the dataset snapshots; each builds its record store, phenotype classifier and
+# gene-list alias index on first use
+snapshots = load_snapshots()
 try:
-    data = pd.read_csv("data/Barseq20250124.csv")
+    coverage = experiment_coverage("data/temp.csv")
 except FileNotFoundError:
-    data = pd.DataFrame(
-        {"gene": [], "gene_name": [], "gene_product": [], "current_version_ID": [],
-         "Relative.Growth.Rate": [], "Confidence": [], "phenotype": []}
-    )
-    print("Warning: Dataset not found. Using an empty DataFrame.")
+    coverage = pd.Series(dtype=int, name="experiments")
 
 # Set the layout
 app.layout = html.Div([
     layout,
-    dcc.Store(id="selected-gene-store")  # Store for the selected gene
+    dcc.Store(id="selected-gene-store"),  # Store for the selected gene
+    dcc.Store(id="session-id", storage_type="session"),  # Per-tab id used to supersede stale requests
+    dcc.Store(id="gene-list-store"),  # Genes matched by the uploaded gene list
+    dcc.Store(id="phenotype-store"),  # Snapshot and classification thresholds currently shown
+    dcc.Store(id="highlight-store"),  # Genes highlighted on the scatter plot by the latest search or list
 ])
 
+# Native table filter set by the search box
+SEARCH_FILTER_PREFIX = "{gene} = "
+
 # Callback to populate the search dropdown options
 # Callback to populate the dropdown options
 @app.callback(
     Output("search-box", "options"),
     Input("search-box", "search_value"),
+    State("snapshot-selector", "value"),
 )
-def update_search_options(search_value):
+def update_search_options(search_value, snapshot):
     """
     Dynamically update dropdown options based on user input.
     """
+    data = snapshots.get(snapshot).data
     if not search_value:
         # Add an "All" option when no search value is provided
         return [{"label": "All", "value": "all"}]
@@ -52,197 +66,384 @@ def update_search_options(search_value):
     return [{"label": "All", "value": "all"}] + options  # Include "All" as the first option
 
 
+# Presentational updates run in the browser (see assets/clientside.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="barseq", function_name="highlightGene"),
+    Output("scatter-plot", "figure"),
+    Output("highlight-store", "data"),
+    Input("search-box", "value"),
+    Input("gene-list-store", "data"),
+    Input("phenotype-store", "data"),  # Reclassified or switched snapshot
+    State("scatter-plot", "figure"),
+    State("highlight-store", "data"),
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="barseq", function_name="filterPhenotypes"),
+    Output("scatter-plot", "figure", allow_duplicate=True),
+    Input("scatter-plot", "restyleData"),  # Legend clicks
+    State("scatter-plot", "figure"),
+    prevent_initial_call=True,
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="barseq", function_name="syncSelectedGene"),
+    Output("selected-gene-store", "data"),
+    Input("search-box", "value"),
+    Input("scatter-plot", "clickData"),
+    Input("data-table", "selected_row_ids"),
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="barseq", function_name="initSession"),
+    Output("session-id", "data"),
+    Input("session-id", "modified_timestamp"),
+    State("session-id", "data"),
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="barseq", function_name="toggleModal"),
+    Output("details-modal", "is_open"),
+    Input("more-details-button", "n_clicks"),
+    Input("close-modal", "n_clicks"),
+    prevent_initial_call=True,
+)
+
+
 @app.callback(
     [
-        Output("scatter-plot", "figure"),  # Update the scatter plot
         Output("plot-details", "children"),  # Update the plot details section
         Output("table-details", "children"),  # Update the table details section
-        Output("data-table", "data"),  # Update the table data
-        Output("selected-gene-store", "data"),  
+        Output("data-table", "filter_query"),  # Narrow the table to the searched gene
     ],
     [
         Input("search-box", "value"),  # Search box selection
         Input("scatter-plot", "clickData"),  # Scatter plot click
-        Input("data-table", "selected_rows"),  # Table row selection
+        Input("data-table", "selected_row_ids"),  # Table row selection (row id = gene)
     ],
+    [State("data-table", "filter_query"), State("snapshot-selector", "value")],
 )
-def update_details(selected_gene, click_data, selected_rows):
+def update_details(selected_gene, click_data, selected_row_ids, filter_query, snapshot):
     """
-    Consolidate updates for the scatter plot, plot details, and table details.
+    Consolidate updates for the plot details, table details, and table filter.
+
+    The table keeps the full dataset as its data (row positions stay stable for the
+    phenotype patches); a search narrows it with a native filter instead.
     """
     ctx = dash.callback_context
-    fig = create_plot().figure  # Default scatter plot
+    records = snapshots.get(snapshot).records
 
-    # Default details and table data
+    # Default details; any other selection clears a filter set by the search box
     plot_details = html.P("Select a point to view details here.")
     table_details = html.P("Select a row to view details here.")
-    filtered_table_data = data.to_dict("records")  # Default to full dataset
-    stored_gene = None  # Default if no gene is selected
+    table_filter = "" if (filter_query or "").startswith(SEARCH_FILTER_PREFIX) else dash.no_update
 
     # Determine the trigger
     if not ctx.triggered:
-        return fig, plot_details, table_details, filtered_table_data,stored_gene
+        return plot_details, table_details, table_filter
 
     trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
 
     # Handle search box selection
-    if trigger_id == "search-box" and selected_gene:
-        filtered_data = data[data["gene"] == selected_gene]
-        if not filtered_data.empty:
-            # Extract phenotype color dynamically from the base figure
-            phenotype = filtered_data["phenotype"].iloc[0]
-            color_map = {trace.name: trace.marker.color for trace in fig.data}  # Map phenotype to colors
-            point_color = color_map.get(phenotype, "blue")  # Default to 'blue' if phenotype not found
-            
-            # Make all points in the background lighter
-            for trace in fig.data:
-                trace.marker.opacity = 0.2  # Set background point opacity
-            
-            # Add highlighted marker
-            fig.add_scatter(
-                x=filtered_data["Relative.Growth.Rate"],
-                y=filtered_data["Confidence"],
-                mode="markers",
-                marker=dict(size=20, color=point_color, opacity=1),  # Highlighted point with full opacity
-                name="Selected Gene",
-                hoverinfo="skip",  # Prevent duplicate hover info
-            )
-            # Update plot and table details
-            plot_details = get_selected_row_details(None, [filtered_data.index[0]], data)
-            # Filter table to show only the selected gene
-            filtered_table_data = filtered_data.to_dict("records")
-            stored_gene = selected_gene
+    if trigger_id == "search-box" and selected_gene in records:
+        # Update plot details
+        plot_details = get_selected_row_details(None, [selected_gene], records)
+        # Filter table to show only the selected gene
+        table_filter = f'{SEARCH_FILTER_PREFIX}"{selected_gene}"'
 
     # Handle scatter plot click
     elif trigger_id == "scatter-plot" and click_data:
-        plot_details = get_selected_row_details(click_data, [], data)
-        gene_from_click = click_data["points"][0]["customdata"][0]
-        stored_gene = gene_from_click
+        plot_details = get_selected_row_details(click_data, [], records)
     # Handle table row selection
-    elif trigger_id == "data-table" and selected_rows:
-        selected_row_index = selected_rows[0]
-        gene_from_table = data.iloc[selected_row_index]["gene"] 
-        table_details = get_selected_row_details(None, selected_rows, data)
-        stored_gene = gene_from_table
-    return fig, plot_details, table_details, filtered_table_data,stored_gene
+    elif trigger_id == "data-table" and selected_row_ids:
+        table_details = get_selected_row_details(None, selected_row_ids, records)
+    return plot_details, table_details, table_filter
+
+
+@app.callback(
+    [
+        Output("scatter-plot", "figure", allow_duplicate=True),  # Recolour the points
+        Output("data-table", "data", allow_duplicate=True),  # Relabel the changed rows
+        Output("phenotype-summary", "children"),
+        Output("phenotype-store", "data"),  # Snapshot and thresholds now shown
+    ],
+    [Input("reclassify-toggle", "value")]
+    + [Input(f"threshold-{key}", "value") for key in DEFAULT_THRESHOLDS],
+    [State("phenotype-store", "data"), State("snapshot-selector", "value")],
+    prevent_initial_call=True,
+)
+def reclassify_phenotypes(toggle, *args):
+    """
+    Recompute the phenotype calls of all genes and push only the calls that changed.
+
+    The classification currently shown is recomputed from the stored thresholds, so the
+    table patch carries just the rows whose call differs; the plot gets the new phenotype
+    codes as one typed array, plus the legend counts.
+    """
+    *values, shown, snapshot = args
+    shown = (shown or {}).get("thresholds")  # None for the published calls
+    classifier = snapshots.get(snapshot).classifier
+    thresholds = dict(zip(DEFAULT_THRESHOLDS, values)) if "on" in (toggle or []) else None
+
+    previous = classifier.classify(shown)
+    current = classifier.classify(thresholds)
+    positions = classifier.changed(previous, current)
+    labels = [PHENOTYPES[code] for code in current[positions]]
+
+    differing = len(classifier.changed(classifier.published, current))
+    summary = f"{differing} genes differ from the published calls." if thresholds else "Showing the published calls."
+    if not len(positions):
+        return dash.no_update, dash.no_update, summary, {"snapshot": snapshot, "thresholds": thresholds}
+
+    counts = classifier.counts(current)
+    shown = {"snapshot": snapshot, "thresholds": thresholds}
+    return recolor_plot(current, counts), relabel_table(positions, labels), summary, shown
+
+
+@app.callback(
+    [
+        Output("gene-list-table", "data"),
+        Output("gene-list-summary", "children"),
+        Output("gene-list-store", "data"),
+        Output("gene-list-input", "value"),
+    ],
+    [Input("gene-list-submit", "n_clicks"), Input("gene-list-upload", "contents")],
+    [State("gene-list-input", "value"), State("snapshot-selector", "value")],
+    prevent_initial_call=True,
+)
+def resolve_uploaded_gene_list(n_clicks, upload_contents, pasted_text, snapshot):
+    """
+    Resolve a pasted or uploaded gene list and highlight the matches on the scatter plot.
+    """
+    trigger_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
+    text = decode_upload(upload_contents) if trigger_id == "gene-list-upload" else pasted_text
+
+    # Show an uploaded file in the text area; pasted text is already there
+    shown_text = text if trigger_id == "gene-list-upload" else dash.no_update
+
+    ids = parse_gene_list(text)
+    if not ids:
+        return [], "Enter at least one gene ID.", [], shown_text
+
+    selected = snapshots.get(snapshot)
+    resolved = resolve_gene_list(ids, selected.data, selected.alias_index, coverage)
+    matched_genes = resolved["gene"].dropna().unique().tolist()
+    summary = f"Matched {resolved['gene'].notna().sum()} of {len(ids)} IDs to {len(matched_genes)} genes."
+    return resolved.to_dict("records"), summary, matched_genes, shown_text
+
 
 # Callback for downloading CSV
 @app.callback(
     Output("download-csv", "data"),
     Input("btn-csv", "n_clicks"),
+    State("snapshot-selector", "value"),
     prevent_initial_call=True,
 )
-def download_csv(n_clicks):
-    return send_data_frame(data.to_csv, "Barseq_Data.csv", index=False)
+def download_csv(n_clicks, snapshot):
+    return send_data_frame(snapshots.get(snapshot).data.to_csv, "Barseq_Data.csv", index=False)
 
 # Callback for downloading Excel
 @app.callback(
     Output("download-xlsx", "data"),
     Input("btn-xlsx", "n_clicks"),
+    State("snapshot-selector", "value"),
     prevent_initial_call=True,
 )
-def download_xlsx(n_clicks):
-    return send_data_frame(data.to_excel, "Barseq_Data.xlsx", index=False)
+def download_xlsx(n_clicks, snapshot):
+    return send_data_frame(snapshots.get(snapshot).data.to_excel, "Barseq_Data.xlsx", index=False)
 
 
 @app.callback(
     [
-        Output("details-modal", "is_open"),          # Toggle modal open/close
-        Output("experiment-dropdown", "options"),   # Populate dropdown with experiments
-        Output("experiment-dropdown", "value"),     # Reset dropdown value on modal open
-        Output("modal-table", "children"),          # Populate table with filtered details
+        Output("scatter-plot", "figure", allow_duplicate=True),
+        Output("data-table", "data", allow_duplicate=True),
+        Output("phenotype-store", "data", allow_duplicate=True),
+        Output("reclassify-toggle", "value"),
+        Output("phenotype-summary", "children", allow_duplicate=True),
     ],
-    [Input("more-details-button", "n_clicks"), Input("close-modal", "n_clicks")],
+    Input("snapshot-selector", "value"),
+    prevent_initial_call=True,
+)
+def switch_snapshot(snapshot):
+    """
+    Show another snapshot in the plot and table, starting from its published calls.
+    """
+    data = snapshots.get(snapshot).data
+    # The store always changes here, so the clientside highlight and hover text are reapplied
+    shown = {"snapshot": snapshot, "thresholds": None}
+    return plot_figure(data), table_records(data), shown, [], "Showing the published calls."
+
+
+@app.callback(
+    [
+        Output("snapshot-diff-table", "data"),
+        Output("snapshot-diff-table", "columns"),
+        Output("diff-summary", "children"),
+    ],
+    [Input("diff-before", "value"), Input("diff-after", "value"), Input("diff-min-shift", "value")],
+)
+def compare_snapshots(before, after, min_shift):
+    """
+    List the genes whose phenotype call changed between two snapshots, or whose
+    growth rate shifted by at least min_shift.
+    """
+    diff = snapshots.diff(before, after)  # Cached per pair
+    keep = diff["status"] != "unchanged"
+    if min_shift is not None:
+        keep |= diff["shift"].abs() >= min_shift
+    rows = diff[keep]
+
+    columns = snapshot_diff_columns(before, after)
+    status_counts = diff["status"].value_counts()
+    transitions = (
+        rows[rows["status"] == "phenotype changed"]
+        .groupby(["phenotype_before", "phenotype_after"], observed=True)
+        .size()
+        .sort_values(ascending=False)
+    )
+    summary = html.Div([
+        html.P(", ".join(f"{count} {status}" for status, count in status_counts.items())),
+        html.Ul([html.Li(f"{a} \u2192 {b}: {count}") for (a, b), count in transitions.items()]),
+        html.P(f"Listing {len(rows)} genes."),
+    ])
+    return snapshot_diff_records(rows), columns, summary
+
+
+@app.callback(
     [
-        State("selected-gene-store", "data"),       # Access the selected gene
-        State("experiment-dropdown", "value"),     # Get the selected experiment
+        Output("experiment-dropdown", "options"),   # Populate dropdown with experiments
+        Output("experiment-dropdown", "value"),     # Reset dropdown value on modal open
+        Output("modal-table", "data"),              # Populate table with filtered details
+        Output("modal-table-message", "children"),  # Message when the gene has no details
     ],
+    [Input("more-details-button", "n_clicks")],
+    [State("selected-gene-store", "data"),          # Access the selected gene
+     State("session-id", "data")],
     prevent_initial_call=True,
 )
-def toggle_modal(open_click, close_click, stored_gene, selected_experiment):
-    ctx = dash.callback_context
+def load_modal_details(open_click, stored_gene, session_id):
+    """
+    Fetch the per-experiment details shown when the modal is opened.
 
-    if not ctx.triggered:
-        return False, [], None, ""
+    Opening and closing the modal itself is handled client-side.
+    """
+    if not open_click or not stored_gene:
+        return [], None, [], ""
 
-    trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
+    # Fetch gene details from CSV
+    with sessions.request(session_id, "modal-details"):
+        filtered_df = get_modal_table(stored_gene, file_path="data/temp.csv")
+
+    # If no data is found for the gene
+    if filtered_df.empty:
+        return [], None, [], f"No details found for gene: {stored_gene}"
+
+    # Generate unique experiment options for dropdown
+    experiment_options = [
+        {"label": exp, "value": exp}
+        for exp in sorted(filtered_df["experiment"].unique())
+    ]
+    # Automatically select the first experiment if available
+    first_experiment = experiment_options[0]["value"] if experiment_options else None
 
-    # Handle opening the modal
-    if trigger_id == "more-details-button" and open_click:
-        if open_click > 0:
-            if stored_gene:
-                # Fetch gene details from CSV
-                filtered_df, full_df = get_gene_details_from_csv(stored_gene, file_path="data/temp.csv")
-
-                if not filtered_df.empty:
-                    # Generate unique experiment options for dropdown
-                    experiment_options = [
-                        {"label": exp, "value": exp}
-                        for exp in sorted(filtered_df["experiment"].unique())
-                        ]
-                    # Automatically select the first experiment if available
-                    first_experiment = experiment_options[0]["value"] if experiment_options else None
-
-
-                    # Reset dropdown value and regenerate the table for the full dataset
-                    formatted_table = html.Table(
-                        [
-                            html.Thead(html.Tr([html.Th(col) for col in filtered_df.columns])),
-                            html.Tbody(
-                                [
-                                    html.Tr(
-                                        [
-                                            html.Td(f"{value:.2f}" if isinstance(value, (int, float)) else value)
-                                            for value in row
-                                        ]
-                                    )
-                                    for row in filtered_df.itertuples(index=False, name=None)
-                                ]
-                            ),
-                        ],
-                        className="table table-striped",
-                    )
-
-                    return True, experiment_options, first_experiment, formatted_table
-
-                # If no data is found for the gene
-                return True, [], None, f"No details found for gene: {stored_gene}"
-
-    # Handle closing the modal
-    if trigger_id == "close-modal" and close_click:
-        return False, [], None, ""
-
-    # Default: Reset state
-    return False, [], None, ""
+    # Reset dropdown value and send the table as data; the DataTable formats the numbers
+    return experiment_options, first_experiment, modal_table_records(filtered_df), ""
 
 
 
 @app.callback(
-    [Output("experiment-keys-output", "children"), 
-     Output("modal-figure-ratios", "figure"), 
-     Output("modal-figure-abs", "figure"),
-     Output("modal-figure-inversevar", "figure")],
+    [Output("experiment-keys-output", "children"),
+     Output("control-checklist", "options"),
+     Output("control-checklist", "value")],
     [Input("experiment-dropdown", "value")],
-    [State("selected-gene-store", "data")]
+    [State("selected-gene-store", "data"), State("session-id", "data")]
 )
-def display_experiment_keys(selected_experiment, gene):
+def display_experiment_keys(selected_experiment, gene, session_id):
     if not selected_experiment:
-        return "Please select an experiment.", {}, {}, {}  # Return empty figures
+        return "Please select an experiment.", [], []
 
     if not gene:
-        return "Please select a gene first.", {}, {}, {}  # Return empty figures
+        return "Please select a gene first.", [], []
+
+    with sessions.request(session_id, "experiment-keys"):
+        # A new experiment resets the selection to all of its control barcodes
+        controls = get_experiment_controls(selected_experiment)
+        control_options = [{"label": name, "value": name} for name in controls]
 
-    # Get the keys and the figures for the selected experiment and gene
-    keys, fig_ratios, fig_abs, fig_inversevar = get_experiment_keys(selected_experiment, gene=gene)
+        # Get the keys for the selected experiment
+        keys = get_experiment_keys(selected_experiment)
     if keys:
-        # Display the keys and render the figures
         keys_output = html.Div([
             html.P(f"Keys for selected experiment and gene: {', '.join(keys)}"),
         ])
-        return keys_output, fig_ratios, fig_abs, fig_inversevar
+        return keys_output, control_options, controls
+
+    # If no keys are found, display a message
+    return "No keys found for the selected experiment and gene.", control_options, controls
+
+
+@app.callback(
+    Output("modal-table", "data", allow_duplicate=True),
+    Input("control-checklist", "value"),
+    [State("experiment-dropdown", "value"), State("selected-gene-store", "data"), State("session-id", "data")],
+    prevent_initial_call=True,
+)
+def update_recomputed_growth(selected_controls, selected_experiment, gene, session_id):
+    """
+    Recompute the gene's growth rate in every experiment of the modal table without the
+    controls deselected for the current experiment.
+
+    Control barcodes are shared between experiments but their sets differ, so only the
+    deselected controls are carried over: each experiment keeps the rest of its own
+    controls, and one missing none of them keeps its stored growth rate.
+    """
+    if not selected_experiment or not gene:
+        return dash.no_update
+
+    with sessions.request(session_id, "modal-recompute"):
+        experiments = get_modal_table(gene, file_path="data/temp.csv")["experiment"].tolist()
+        controls = get_experiment_controls(selected_experiment)
+        deselected = sorted(set(controls) - set(selected_controls or []))
+        if deselected:
+            growth_rates = recompute_gene_growth(gene, experiments, deselected)
+        else:
+            growth_rates = [None] * len(experiments)  # The stored growth rates apply
+
+    # Rows keep the order of get_modal_table; native sorting only reorders the view
+    patched = Patch()
+    for row, growth_rate in enumerate(growth_rates):
+        patched[row]["recomputed"] = None if growth_rate is None else round(growth_rate, MODAL_TABLE_DECIMALS)
+    return patched
+
+
+def register_modal_figure_callback(kind):
+    """
+    Register the callback for one modal figure, so each figure loads independently.
+    """
+    @app.callback(
+        Output(f"modal-figure-{kind}", "figure"),
+        Input("control-checklist", "value"),
+        [State("experiment-dropdown", "value"), State("selected-gene-store", "data"), State("session-id", "data")],
+        prevent_initial_call=True,
+    )
+    def update_modal_figure(selected_controls, selected_experiment, gene, session_id):
+        if not selected_experiment or not gene:
+            return {}  # Return empty figure
+
+        with sessions.request(session_id, f"modal-figure-{kind}"):
+            controls = get_experiment_controls(selected_experiment)
+            if controls and not selected_controls:
+                return {}  # At least one control barcode is needed to normalise
+
+            # Only re-normalise from raw counts when the user deselects some controls
+            recompute_controls = selected_controls if set(selected_controls or []) != set(controls) else None
+            return get_modal_figure(kind, selected_experiment, gene, controls=recompute_controls)
+
+    return update_modal_figure
+
 
-    # If no keys are found, display a message and return empty figures
-    return "No keys found for the selected experiment and gene.", {}, {}, {}
+for figure_kind in MODAL_FIGURE_BUILDERS:
+    register_modal_figure_callback(figure_kind)
 
 
 # Run the app
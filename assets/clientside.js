@@ -0,0 +1,187 @@
+/* Clientside callbacks: presentational updates that need no server round-trip */
+
+// Typed-array constructors for plotly.js base64 encoding (see utils/figure_encoding.py)
+const TYPED_ARRAYS = {
+    i1: Int8Array, u1: Uint8Array, i2: Int16Array, u2: Uint16Array,
+    i4: Int32Array, u4: Uint32Array, f4: Float32Array, f8: Float64Array,
+};
+
+function decodeArray(value) {
+    if (!value || !value.bdata) {
+        return value || [];
+    }
+    const bytes = Uint8Array.from(atob(value.bdata), function (c) { return c.charCodeAt(0); });
+    return new TYPED_ARRAYS[value.dtype](bytes.buffer);
+}
+
+/**
+ * Apply the phenotype view of the scatter plot, derived from the per-point phenotype codes.
+ *
+ * The data trace carries its phenotype codes in marker.color and their labels in meta
+ * (see components/plots.py). Its hover text is expanded from them here, and genes whose
+ * phenotype is hidden from the legend are dropped through selectedpoints.
+ */
+function withPhenotypeView(figure) {
+    const hidden = new Set();
+    figure.data.forEach(function (trace) {
+        if (typeof trace.meta === "number" && trace.visible === "legendonly") {
+            hidden.add(trace.meta);
+        }
+    });
+    const data = figure.data.map(function (trace) {
+        if (!Array.isArray(trace.meta) || !trace.marker) {
+            return trace;
+        }
+        const codes = decodeArray(trace.marker.color);
+        const text = new Array(codes.length);
+        const shown = [];
+        for (let i = 0; i < codes.length; i++) {
+            text[i] = trace.meta[codes[i]];
+            if (!hidden.has(codes[i])) {
+                shown.push(i);
+            }
+        }
+        return Object.assign({}, trace, {
+            text: text,
+            visible: true,  // Hidden through its points, never as a whole
+            selectedpoints: hidden.size ? shown : null,
+            unselected: {marker: {opacity: 0}},
+        });
+    });
+    return Object.assign({}, figure, {data: data});
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    barseq: {
+        /**
+         * Give each browser tab a stable id so the server can drop its superseded requests.
+         */
+        initSession: function (timestamp, sessionId) {
+            if (sessionId) {
+                return window.dash_clientside.no_update;
+            }
+            if (window.crypto && window.crypto.randomUUID) {
+                return window.crypto.randomUUID();
+            }
+            return Date.now().toString(36) + Math.random().toString(36).slice(2);
+        },
+
+        /**
+         * Open the details modal from "More Details" and close it from "Close".
+         */
+        toggleModal: function (openClick, closeClick) {
+            const triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered.length) {
+                return window.dash_clientside.no_update;
+            }
+            const triggerId = triggered[0].prop_id.split(".")[0];
+            return triggerId === "more-details-button" && Boolean(openClick);
+        },
+
+        /**
+         * Keep the selected gene store in sync with the search box, plot clicks and table rows.
+         */
+        syncSelectedGene: function (searchValue, clickData, selectedRowIds) {
+            const triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered.length) {
+                return null;
+            }
+            const triggerId = triggered[0].prop_id.split(".")[0];
+
+            if (triggerId === "search-box" && searchValue && searchValue !== "all") {
+                return searchValue;
+            }
+            if (triggerId === "scatter-plot" && clickData) {
+                return clickData.points[0].customdata[0];
+            }
+            if (triggerId === "data-table" && selectedRowIds && selectedRowIds.length) {
+                return selectedRowIds[0];  // Row ids are gene IDs
+            }
+            return null;
+        },
+
+        /**
+         * Show or hide the genes of a phenotype from its legend entry.
+         */
+        filterPhenotypes: function (restyleData, figure) {
+            if (!figure || !restyleData || !("visible" in restyleData[0])) {
+                return window.dash_clientside.no_update;
+            }
+            // Keep the legend state plotly.js applied, so the figure prop reflects it
+            const update = restyleData[0];
+            const data = figure.data.slice();
+            (restyleData[1] || []).forEach(function (index, k) {
+                const visible = Array.isArray(update.visible) ? update.visible[k % update.visible.length] : update.visible;
+                data[index] = Object.assign({}, data[index], {visible: visible});
+            });
+            return withPhenotypeView(Object.assign({}, figure, {data: data}));
+        },
+
+        /**
+         * Highlight the searched gene (or the genes of an uploaded list) and fade the other points.
+         *
+         * The most recent of the search and the gene list wins; the highlighted genes are
+         * kept in highlight-store, so a reclassification or snapshot switch rebuilds the
+         * highlight and hover text of the new phenotype codes or figure.
+         */
+        highlightGene: function (gene, geneList, phenotypes, figure, highlighted) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!figure) {
+                return [noUpdate, noUpdate];
+            }
+            const triggered = window.dash_clientside.callback_context.triggered;
+            const triggerId = triggered.length ? triggered[0].prop_id.split(".")[0] : null;
+            let genes = highlighted || [];
+            if (triggerId === "search-box") {
+                genes = gene && gene !== "all" ? [gene] : [];
+            } else if (triggerId === "gene-list-store") {
+                genes = geneList || [];
+            }
+            const selected = new Set(genes);
+            const single = selected.size === 1;
+
+            // Drop the highlight marker from any previous selection
+            const traces = figure.data.filter(function (trace) {
+                return trace.name !== "Selected Gene" && trace.name !== "Selected Genes";
+            });
+
+            const hits = {x: [], y: [], color: [], marker: {}};
+            traces.forEach(function (trace) {
+                const custom = trace.customdata || [];
+                if (!selected.size || !custom.length) {
+                    return;
+                }
+                const xs = decodeArray(trace.x);
+                const ys = decodeArray(trace.y);
+                const codes = decodeArray(trace.marker.color);  // Phenotype codes
+                for (let i = 0; i < custom.length; i++) {
+                    if (selected.has(custom[i][0])) {
+                        hits.x.push(xs[i]);
+                        hits.y.push(ys[i]);
+                        hits.color.push(codes[i]);
+                    }
+                }
+                // Same code-to-colour mapping as the data trace
+                hits.marker = {colorscale: trace.marker.colorscale, cmin: trace.marker.cmin, cmax: trace.marker.cmax};
+            });
+
+            const found = hits.x.length > 0;
+            const opacity = found ? 0.2 : 1;
+            const data = traces.map(function (trace) {
+                return Object.assign({}, trace, {marker: Object.assign({}, trace.marker, {opacity: opacity})});
+            });
+            if (found) {
+                data.push({
+                    type: "scatter",
+                    x: hits.x,
+                    y: hits.y,
+                    mode: "markers",
+                    marker: Object.assign({size: single ? 20 : 10, color: hits.color, opacity: 1}, hits.marker),
+                    name: single ? "Selected Gene" : "Selected Genes",
+                    hoverinfo: "skip",
+                });
+            }
+            return [withPhenotypeView(Object.assign({}, figure, {data: data})), genes];
+        },
+    },
+});
@@ -1,7 +1,113 @@
-from dash import dcc, html
+from dash import dash_table, dcc, html
 from dash_bootstrap_components import Tabs, Tab, Row, Col,Modal, ModalBody, ModalHeader, ModalFooter
 from components.plots import create_plot
-from utils.helpers import create_table, download_links
+from utils.helpers import MODAL_TABLE_COLUMNS, create_table, download_links
+from utils.genelist import GENE_LIST_COLUMNS
+from utils.phenotypes import DEFAULT_THRESHOLDS
+from utils.snapshots import load_snapshots
+
+def threshold_slider(key, label, minimum, maximum, step):
+    """
+    Labelled slider for one of the phenotype classification thresholds.
+    """
+    return html.Div(
+        [
+            html.Label(label, className="form-label small"),
+            dcc.Slider(
+                id=f"threshold-{key}",
+                min=minimum,
+                max=maximum,
+                step=step,
+                value=DEFAULT_THRESHOLDS[key],
+                marks=None,
+                tooltip={"placement": "bottom", "always_visible": True},
+                updatemode="drag",  # Reclassify while dragging
+            ),
+        ],
+        className="mb-2",
+    )
+
+
+def phenotype_controls():
+    """
+    Control panel to reclassify the phenotype calls with custom thresholds.
+    """
+    return html.Div(
+        [
+            html.H6("Phenotype thresholds"),
+            dcc.Checklist(
+                id="reclassify-toggle",
+                options=[{"label": "Reclassify with these thresholds", "value": "on"}],
+                value=[],
+                inputStyle={"margin-right": "6px"},
+            ),
+            threshold_slider("essential_max", "Essential: lower bound below", 0, 0.5, 0.01),
+            threshold_slider("dispensable_min", "Dispensable: upper bound at least", 0.5, 1.2, 0.01),
+            threshold_slider("fast_min", "Fast: lower bound above", 0.8, 1.5, 0.01),
+            threshold_slider("min_confidence", "Insufficient data: confidence below", 0, 10, 0.1),
+            html.Div(id="phenotype-summary", className="small text-muted"),
+        ],
+        className="p-3 border bg-light mt-3",
+    )
+
+
+# Snapshots available in the selectors, latest last
+snapshot_options = [{"label": label, "value": label} for label in load_snapshots().labels]
+latest_snapshot = load_snapshots().latest.label
+
+
+def snapshot_diff_tab():
+    """
+    Tab comparing two snapshots: changed phenotype calls and growth-rate shifts.
+    """
+    before = snapshot_options[-2]["value"] if len(snapshot_options) > 1 else latest_snapshot
+    return Row(
+        [
+            Col(
+                html.Div(
+                    [
+                        html.Label("Compare snapshot:", className="form-label"),
+                        dcc.Dropdown(id="diff-before", options=snapshot_options, value=before, clearable=False),
+                        html.Label("with snapshot:", className="form-label mt-2"),
+                        dcc.Dropdown(id="diff-after", options=snapshot_options, value=latest_snapshot, clearable=False),
+                        html.Label("Also list growth-rate shifts of at least:", className="form-label mt-2"),
+                        dcc.Input(id="diff-min-shift", type="number", value=0.1, min=0, step=0.05,
+                                  style={"width": "100%"}),
+                        html.Div(id="diff-summary", className="mt-3 small"),
+                    ],
+                    className="p-3 border bg-light",
+                ),
+                width=3,
+            ),
+            Col(
+                html.Div(
+                    dash_table.DataTable(
+                        id="snapshot-diff-table",
+                        columns=[],  # Named after the compared snapshots
+                        data=[],
+                        sort_action="native",
+                        filter_action="native",
+                        page_action="none",
+                        virtualization=True,  # Only the visible rows are rendered
+                        fixed_rows={"headers": True},
+                        export_format="csv",
+                        style_table={"height": "500px", "overflowY": "auto"},
+                        style_header={"backgroundColor": "#f8f9fa", "fontWeight": "bold"},
+                        style_cell={"textAlign": "left", "minWidth": "110px"},
+                        style_data_conditional=[
+                            {"if": {"filter_query": '{status} = "phenotype changed"'}, "backgroundColor": "#fff3cd"},
+                            {"if": {"filter_query": '{status} = "added"'}, "backgroundColor": "#d1e7dd"},
+                            {"if": {"filter_query": '{status} = "removed"'}, "color": "#adb5bd"},
+                        ],
+                    ),
+                    className="tab-content",
+                ),
+                width=9,
+            ),
+        ],
+        className="mt-3",
+    )
+
 
 # Define the layout
 layout = html.Div(
@@ -18,14 +124,35 @@ layout = html.Div(
         # Search Box Section
         html.Div(
             [
-                html.Label("Search Genes:", className="form-label"),
-                dcc.Dropdown(
-                    id="search-box",
-                    options=[],  # Will be populated dynamically
-                    placeholder="Type to search by gene, gene_name, gene_product, or current_version_ID...",
-                    multi=False,
-                    searchable=True,
-                    style={"width": "100%"},
+                Row(
+                    [
+                        Col(
+                            [
+                                html.Label("Search Genes:", className="form-label"),
+                                dcc.Dropdown(
+                                    id="search-box",
+                                    options=[],  # Will be populated dynamically
+                                    placeholder="Type to search by gene, gene_name, gene_product, or current_version_ID...",
+                                    multi=False,
+                                    searchable=True,
+                                    style={"width": "100%"},
+                                ),
+                            ],
+                            width=9,
+                        ),
+                        Col(
+                            [
+                                html.Label("Dataset snapshot:", className="form-label"),
+                                dcc.Dropdown(
+                                    id="snapshot-selector",
+                                    options=snapshot_options,
+                                    value=latest_snapshot,
+                                    clearable=False,
+                                ),
+                            ],
+                            width=3,
+                        ),
+                    ]
                 ),
             ],
             className="container my-3",
@@ -41,11 +168,14 @@ layout = html.Div(
                             [
                                 Col(create_plot(), width=9, className="tab-content"),
                                 Col(
-                                    html.Div(
-                                        id="plot-details",
-                                        className="p-3 border bg-light",
-                                        children=html.P("Select a point to view details here."),
-                                    ),
+                                    [
+                                        html.Div(
+                                            id="plot-details",
+                                            className="p-3 border bg-light",
+                                            children=html.P("Select a point to view details here."),
+                                        ),
+                                        phenotype_controls(),
+                                    ],
                                     width=3,
                                 ),
                             ],
@@ -83,6 +213,67 @@ layout = html.Div(
                         ),
                     ],
                 ),
+                Tab(
+                    label="Gene List",
+                    tab_id="gene-list-tab",
+                    children=[
+                        Row(
+                            [
+                                Col(
+                                    html.Div(
+                                        [
+                                            html.Label("Paste gene IDs or aliases (one per line, or comma separated):", className="form-label"),
+                                            dcc.Textarea(
+                                                id="gene-list-input",
+                                                placeholder="PBANKA_140160\nPBANKA_031480\n...",
+                                                style={"width": "100%", "height": "200px"},
+                                            ),
+                                            dcc.Upload(
+                                                id="gene-list-upload",
+                                                children=html.Div(["Or drop / ", html.A("select a text file")]),
+                                                className="p-2 my-2 border rounded text-center",
+                                                multiple=False,
+                                            ),
+                                            html.Button("Look up genes", id="gene-list-submit", className="btn btn-primary"),
+                                            html.Div(id="gene-list-summary", className="mt-2 text-muted"),
+                                        ],
+                                        className="tab-content",
+                                    ),
+                                    width=3,
+                                ),
+                                Col(
+                                    html.Div(
+                                        dash_table.DataTable(
+                                            id="gene-list-table",
+                                            columns=[{"name": col, "id": col} for col in GENE_LIST_COLUMNS],
+                                            data=[],
+                                            page_size=20,
+                                            sort_action="native",
+                                            filter_action="native",
+                                            export_format="csv",
+                                            style_table={"overflowX": "auto"},
+                                            style_header={"backgroundColor": "#f8f9fa", "fontWeight": "bold"},
+                                            style_data_conditional=[
+                                                {
+                                                    "if": {"filter_query": "{gene} is blank"},  # Unmatched queries
+                                                    "color": "#adb5bd",
+                                                }
+                                            ],
+                                        ),
+                                        className="tab-content",
+                                    ),
+                                    width=9,
+                                ),
+                            ],
+                            className="mt-3",
+                        ),
+                    ],
+                ),
+                Tab(
+                    label="Compare Snapshots",
+                    tab_id="snapshot-diff-tab",
+                    children=[snapshot_diff_tab()],
+                ),
             ]
         ),
 
@@ -96,9 +287,21 @@ layout = html.Div(
                         html.Div(
                             [
                                 
-                                html.Div(
-                                    id="modal-table",  # This will hold the dynamically generated table
-                                    children="Details will appear here.",
+                                html.Div(id="modal-table-message", className="text-muted"),
+                                dash_table.DataTable(
+                                    id="modal-table",  # Per-experiment details of the selected gene
+                                    columns=MODAL_TABLE_COLUMNS,
+                                    data=[],
+                                    sort_action="native",
+                                    page_action="none",
+                                    virtualization=True,  # Only the visible rows are rendered
+                                    fixed_rows={"headers": True},
+                                    style_table={"height": "300px", "overflowY": "auto", "marginBottom": "15px"},
+                                    style_header={"backgroundColor": "#f8f9fa", "fontWeight": "bold"},
+                                    style_cell={"textAlign": "left", "minWidth": "120px"},
+                                    style_data_conditional=[
+                                        {"if": {"row_index": "odd"}, "backgroundColor": "#f8f9fa"}
+                                    ],
                                 ),
                                 dcc.Dropdown(
                                     id="experiment-dropdown",
@@ -107,16 +310,24 @@ layout = html.Div(
                                     style={"margin-bottom": "15px"},
                                     value=None,  # This will be updated dynamically
                                 ),
+                                html.Label("Control barcodes used for normalization:", className="form-label"),
+                                dcc.Checklist(
+                                    id="control-checklist",
+                                    options=[],  # Populated with the experiment's control barcodes
+                                    value=[],
+                                    inline=True,
+                                    inputStyle={"margin-right": "4px", "margin-left": "10px"},
+                                ),
                                 html.Div(id="experiment-keys-output", style={"display": "none","margin-top": "20px"}),
                                 
                         html.H4("Plot of barcode ratios in the population", style={"marginTop": "20px"}),
-                        dcc.Graph(id="modal-figure-ratios", style={"marginTop": "10px"}),
+                        dcc.Loading(dcc.Graph(id="modal-figure-ratios", style={"marginTop": "10px"})),
 
                         html.H4("Normalized growth rate at each timepoint/mouse", style={"marginTop": "20px"}),
-                        dcc.Graph(id="modal-figure-abs", style={"marginTop": "10px"}),
+                        dcc.Loading(dcc.Graph(id="modal-figure-abs", style={"marginTop": "10px"})),
 
                         html.H4("Estimated accuracy of fitnesses at each timepoint/mouse", style={"marginTop": "20px"}),
-                        dcc.Graph(id="modal-figure-inversevar", style={"marginTop": "10px"}),
+                        dcc.Loading(dcc.Graph(id="modal-figure-inversevar", style={"marginTop": "10px"})),
                         
                             ]
                         )
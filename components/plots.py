@@ -1,9 +1,13 @@
-from dash import dcc
-import plotly.express as px
-import pandas as pd
+from dash import Patch, dcc
+import numpy as np
+import plotly.graph_objects as go
 
-# Load the dataset
-data = pd.read_csv("data/Barseq20250124.csv")
+from utils.figure_encoding import encode_array, encode_figure
+from utils.phenotypes import PHENOTYPES, phenotype_codes
+from utils.snapshots import load_snapshots
+
+# Load the dataset (latest snapshot)
+data = load_snapshots().latest.data
 
 # Define custom colors for phenotypes
 phenotype_colors = {
@@ -14,22 +18,99 @@ phenotype_colors = {
     "Fast": "#FFC0CB",  # Orange
 }
 
-# Function to create the plot
-def create_plot():
-    fig = px.scatter(
-        data,
-        x="Relative.Growth.Rate",
-        y="Confidence",
-        color="phenotype",
+
+# Stepped colorscale mapping each phenotype code (index into PHENOTYPES) to its colour
+PHENOTYPE_COLORSCALE = [
+    [(code + edge) / len(PHENOTYPES), phenotype_colors[phenotype]]
+    for code, phenotype in enumerate(PHENOTYPES)
+    for edge in (0, 1)
+]
+
+
+def legend_name(phenotype, count):
+    """
+    Legend entry of a phenotype, with its number of genes.
+    """
+    return f"{phenotype} ({count})"
+
+
+# Function to create the plot figure of a snapshot
+def plot_figure(data):
+    """
+    Scatter plot of growth rate vs confidence, coloured by phenotype.
+
+    All genes are drawn as a single trace whose marker colours are phenotype codes
+    (indices into PHENOTYPES) mapped through a stepped colorscale, so they travel as a
+    one-byte typed array and a reclassification only has to patch the codes (see
+    recolor_plot). The legend is made of one empty trace per phenotype, placed after
+    the data trace; hiding phenotypes from the legend and the phenotype shown in the
+    hover are derived from the codes in the browser (see assets/clientside.js).
+
+    Returns:
+        dict: Encoded Plotly figure.
+    """
+    codes = phenotype_codes(data["phenotype"])
+    counts = np.bincount(codes, minlength=len(PHENOTYPES))
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=data["Relative.Growth.Rate"],
+        y=data["Confidence"],
+        mode="markers",
+        name="Genes",
+        marker=dict(
+            size=6, opacity=1, color=codes, colorscale=PHENOTYPE_COLORSCALE,
+            cmin=-0.5, cmax=len(PHENOTYPES) - 0.5, showscale=False,
+        ),
+        customdata=np.column_stack([data["gene"]]),  # Add 'gene' to custom data for interactivity
+        meta=PHENOTYPES,  # Labels of the codes, for the hover text
+        hovertemplate="gene=%{customdata[0]}<br>Growth Rate=%{x:.2f}<br>Confidence=%{y:.2f}<br>phenotype=%{text}<extra></extra>",
+        showlegend=False,
+    ))
+    for code, phenotype in enumerate(PHENOTYPES):
+        fig.add_trace(go.Scatter(
+            x=[None],
+            y=[None],
+            mode="markers",
+            name=legend_name(phenotype, int(counts[code])),
+            marker=dict(size=6, color=phenotype_colors[phenotype]),
+            meta=code,  # Phenotype code hidden by a click on this legend entry
+            hoverinfo="skip",
+        ))
+    fig.update_layout(
         title="Scatter Plot of Growth Rate vs Confidence",
-        labels={"Relative.Growth.Rate": "Growth Rate", "Confidence": "Confidence"},
+        xaxis_title="Growth Rate",
+        yaxis_title="Confidence",
+        legend_title_text="phenotype",
         template="plotly_white",
-        custom_data=["gene"],  # Add 'gene' to custom data for interactivity
-        hover_data={"gene": True, "Relative.Growth.Rate": ":.2f", "Confidence": ":.2f"},  # Format hover data
-        color_discrete_map=phenotype_colors,  # Apply custom colors
     )
-    fig.update_traces(marker=dict(size=6, opacity=1))  # Default marker size and opacity
+    return encode_figure(fig)  # Compact typed-array payload
+
+
+# Function to create the plot
+def create_plot():
     return dcc.Graph(
         id="scatter-plot",  # Add an ID for callback reference
-        figure=fig
+        figure=plot_figure(data),
     )
+
+
+def recolor_plot(codes, counts):
+    """
+    Patch the scatter plot after a reclassification.
+
+    The code array is replaced as a whole: as a one-byte typed array it is smaller than
+    per-point patch operations as soon as a few hundred points change.
+
+    Parameters:
+        codes (numpy.ndarray): Phenotype code of every gene, in row order.
+        counts (list): Number of genes per phenotype, in PHENOTYPES order.
+
+    Returns:
+        dash.Patch: Updates of the point colours and of the legend counts.
+    """
+    patch = Patch()
+    patch["data"][0]["marker"]["color"] = encode_array(codes)
+    for trace, (phenotype, count) in enumerate(zip(PHENOTYPES, counts), start=1):
+        patch["data"][trace]["name"] = legend_name(phenotype, count)
+    return patch
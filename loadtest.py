@@ -0,0 +1,350 @@
+"""
+Local load test: replay realistic Dash sessions against a locally started gunicorn.
+
+Each virtual user types in the search box, selects a gene, clicks the scatter plot,
+opens the details modal and switches between experiments, sending the same
+/_dash-update-component requests as the browser. Latency percentiles are reported
+per callback, together with throughput and error rate.
+
+Examples:
+    python loadtest.py --users 20 --duration 60
+    python loadtest.py --sweep 1x4,2x4,2x8,4x4 --users 40 --duration 30
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Think time between user actions (seconds)
+THINK_TIME = (0.1, 0.5)
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def load_gene_experiments(csv_path="data/temp.csv"):
+    """
+    Map genes to the experiments they have fitness values in, to script valid sessions.
+    """
+    gene_experiments = defaultdict(list)
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["fitness"] not in ("", "NA"):
+                gene_experiments[row["gene"]].append(row["experiment"])
+    return {gene: experiments for gene, experiments in gene_experiments.items() if experiments}
+
+
+class DashClient:
+    """
+    Minimal client for the Dash callback endpoint, built from /_dash-dependencies.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        dependencies = json.loads(self._request("GET", "/_dash-dependencies"))
+        # Server-side callbacks keyed by their first output ("component.property")
+        self.callbacks = {
+            self._outputs(dep["output"])[0]: dep
+            for dep in dependencies
+            if not dep.get("clientside_function")
+        }
+
+    def triggered_by(self, prop):
+        """
+        First outputs of the server-side callbacks that have `prop` ("component.property") as an input.
+        """
+        return [
+            output for output, dep in self.callbacks.items()
+            if any(f"{item['id']}.{item['property']}" == prop for item in dep["inputs"])
+        ]
+
+    @staticmethod
+    def _outputs(output):
+        if output.startswith(".."):
+            return output.strip(".").split("...")
+        return [output]
+
+    def _request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    def call(self, output, values, changed):
+        """
+        Invoke the callback whose first output is `output`.
+
+        Parameters:
+            output (str): First output of the callback, e.g. "search-box.options".
+            values (dict): Values for its inputs and states, keyed by "component.property".
+            changed (list): Inputs reported as triggering the call.
+        """
+        dep = self.callbacks[output]
+        outputs = [
+            {"id": name.rsplit(".", 1)[0], "property": name.rsplit(".", 1)[1]}
+            for name in self._outputs(dep["output"])
+        ]
+
+        def _fill(items):
+            return [
+                {**item, "value": values.get(f"{item['id']}.{item['property']}")}
+                for item in items
+            ]
+
+        body = {
+            "output": dep["output"],
+            "outputs": outputs if len(outputs) > 1 else outputs[0],
+            "inputs": _fill(dep["inputs"]),
+            "state": _fill(dep["state"]),
+            "changedPropIds": changed,
+        }
+        return self._request("POST", "/_dash-update-component", body)
+
+
+class Stats:
+    """
+    Thread-safe latency and error accounting per callback.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            if ok:
+                self.latencies[name].append(seconds)
+            else:
+                self.errors[name] += 1
+
+    def summary(self, elapsed):
+        rows = []
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            latencies = self.latencies[name]
+            total = len(latencies) + self.errors[name]
+            rows.append({
+                "callback": name,
+                "requests": total,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+                "error_rate": self.errors[name] / total if total else 0.0,
+            })
+        requests = sum(row["requests"] for row in rows)
+        errors = sum(self.errors.values())
+        return {
+            "callbacks": rows,
+            "requests": requests,
+            "throughput_rps": requests / elapsed if elapsed else 0.0,
+            "error_rate": errors / requests if requests else 0.0,
+        }
+
+
+class VirtualUser:
+    """
+    One scripted browser session.
+    """
+
+    def __init__(self, client, stats, gene_experiments, rng):
+        self.client = client
+        self.stats = stats
+        self.gene_experiments = gene_experiments
+        self.genes = sorted(gene_experiments)
+        self.rng = rng
+        self.session_id = uuid.uuid4().hex
+
+    def _call(self, output, values, changed):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.client.call(output, values, changed)
+        except (urllib.error.URLError, OSError, ValueError):
+            pass
+        # Duplicate outputs carry an "@<hash>" suffix that only clutters the report
+        self.stats.record(output.split("@")[0], time.perf_counter() - start, response is not None)
+        return response
+
+    def _think(self):
+        time.sleep(self.rng.uniform(*THINK_TIME))
+
+    def run_session(self):
+        gene = self.rng.choice(self.genes)
+        experiments = sorted(set(self.gene_experiments[gene]))
+
+        # Type the gene ID into the search box, a few characters per keystroke burst
+        for length in range(3, len(gene) + 1, 3):
+            self._call("search-box.options", {"search-box.search_value": gene[:length]}, ["search-box.search_value"])
+        self._think()
+
+        # Pick it from the dropdown, then click its point on the scatter plot
+        self._call("plot-details.children", {"search-box.value": gene}, ["search-box.value"])
+        self._think()
+        click = {"points": [{"customdata": [gene]}]}
+        self._call("plot-details.children", {"search-box.value": gene, "scatter-plot.clickData": click},
+                   ["scatter-plot.clickData"])
+        self._think()
+
+        # Open the details modal
+        selection = {"selected-gene-store.data": gene, "session-id.data": self.session_id}
+        self._call("experiment-dropdown.options", {**selection, "more-details-button.n_clicks": 1},
+                   ["more-details-button.n_clicks"])
+
+        # Switch between a few experiments; everything listening to the control checklist
+        # (the three figures and the table recompute) loads in parallel like in the browser
+        for experiment in self.rng.sample(experiments, min(3, len(experiments))):
+            values = {**selection, "experiment-dropdown.value": experiment}
+            response = self._call("experiment-keys-output.children", values, ["experiment-dropdown.value"])
+            # These are triggered by the control checklist that this response resets
+            try:
+                checklist = json.loads(response)["response"]["control-checklist"]["value"]
+            except (TypeError, KeyError, ValueError):
+                continue
+            values["control-checklist.value"] = checklist
+            dependents = self.client.triggered_by("control-checklist.value")
+            with ThreadPoolExecutor(max_workers=len(dependents) or 1) as pool:
+                for name in dependents:
+                    pool.submit(self._call, name, values, ["control-checklist.value"])
+            self._think()
+
+
+def run_load(base_url, users, duration, csv_path, seed=0):
+    """
+    Run virtual users against a server for a fixed duration.
+
+    Returns:
+        dict: Summary with per-callback percentiles, throughput and error rate.
+    """
+    client = DashClient(base_url)
+    gene_experiments = load_gene_experiments(csv_path)
+    stats = Stats()
+    deadline = time.monotonic() + duration
+
+    def _user(index):
+        user = VirtualUser(client, stats, gene_experiments, random.Random(seed + index))
+        while time.monotonic() < deadline:
+            user.run_session()
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=_user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.summary(time.monotonic() - start)
+
+
+def start_gunicorn(port, workers, threads, timeout=120):
+    """
+    Start the app under gunicorn with the Dockerfile's worker class and wait until it serves.
+    """
+    env = dict(os.environ, GUNICORN_CMD_ARGS="")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "app:server",
+            f"--bind=127.0.0.1:{port}", f"--workers={workers}", f"--threads={threads}",
+            "--worker-class=gthread",
+        ],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup.")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_dash-dependencies", timeout=5).read()
+            return process
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("gunicorn did not start in time.")
+
+
+def stop_gunicorn(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def print_summary(summary, label=""):
+    if label:
+        print(f"\n== {label} ==")
+    print(f"{'callback':40s} {'requests':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'errors':>7s}")
+    for row in summary["callbacks"]:
+        print(f"{row['callback']:40s} {row['requests']:8d} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} "
+              f"{row['p99_ms']:8.1f} {row['error_rate']:7.1%}")
+    print(f"throughput: {summary['throughput_rps']:.1f} req/s, error rate: {summary['error_rate']:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per run")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--url", default=None, help="Test an already running server instead of starting gunicorn")
+    parser.add_argument("--sweep", default=None, help="Comma-separated WORKERSxTHREADS settings, e.g. 1x4,2x4,4x8")
+    parser.add_argument("--csv", default="data/temp.csv", help="Per-experiment table used to pick genes")
+    parser.add_argument("--json", default=None, help="Also write the summaries to this JSON file")
+    args = parser.parse_args()
+
+    if args.url:
+        settings = [None]
+    elif args.sweep:
+        settings = [tuple(int(n) for n in item.split("x")) for item in args.sweep.split(",")]
+    else:
+        settings = [(args.workers, args.threads)]
+
+    results = []
+    for setting in settings:
+        if setting is None:
+            summary = run_load(args.url, args.users, args.duration, args.csv)
+            label = args.url
+        else:
+            workers, threads = setting
+            process = start_gunicorn(args.port, workers, threads)
+            try:
+                summary = run_load(f"http://127.0.0.1:{args.port}", args.users, args.duration, args.csv)
+            finally:
+                stop_gunicorn(process)
+            label = f"workers={workers} threads={threads}"
+        print_summary(summary, label)
+        results.append({"setting": label, **summary})
+
+    if len(results) > 1:
+        print(f"\n{'setting':28s} {'req/s':>8s} {'errors':>7s} {'worst p95 ms':>13s}")
+        for result in results:
+            worst = max((row["p95_ms"] for row in result["callbacks"]), default=float("nan"))
+            print(f"{result['setting']:28s} {result['throughput_rps']:8.1f} {result['error_rate']:7.1%} {worst:13.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
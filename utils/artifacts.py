@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from utils.singleflight import dataset_version
+
+# Default location of the pre-rendered modal artifacts
+STORE_ROOT = "data/artifacts"
+
+# Bump when the figure builders or the table layout change, so every artifact is rebuilt
+ARTIFACT_VERSION = 2
+
+# Data files the artifacts are derived from
+SOURCE_FILES = {
+    "json_file": "data/arrays.json",
+    "order_file": "data/experiment_order.txt",
+    "csv_file": "data/temp.csv",
+}
+
+
+def content_hash(*parts):
+    """
+    SHA-256 hex digest of some strings or bytes, used to address content and sources.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _write_atomic(path, payload):
+    """
+    Write bytes to a path through a temporary file, so readers never see partial files.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+class ArtifactStore:
+    """
+    Content-addressed on-disk store of pre-rendered modal figures and tables.
+
+    Layout under the root directory:
+        objects/<hh>/<hash>.json.gz   one serialized artifact, named by the hash of its JSON
+        manifests/<source hash>.json  artifact hashes derived from one source (an experiment
+                                      of arrays.json, or temp.csv for the tables)
+        index.json                    manifests of the current dataset and the file versions
+                                      they were built from
+    """
+
+    def __init__(self, root=STORE_ROOT):
+        self.root = root
+
+    def object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.json.gz")
+
+    def manifest_path(self, source_hash):
+        return os.path.join(self.root, "manifests", f"{source_hash}.json")
+
+    def index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def put(self, value):
+        """
+        Store a JSON-serializable value and return its content hash.
+
+        Identical content maps to the same object, so unchanged artifacts are not rewritten.
+        """
+        payload = json.dumps(value, separators=(",", ":")).encode()
+        digest = content_hash(payload)
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            _write_atomic(path, gzip.compress(payload, compresslevel=6))
+        return digest
+
+    def get(self, digest):
+        """
+        Load a stored value by its content hash.
+        """
+        with gzip.open(self.object_path(digest), "rb") as f:
+            return json.loads(f.read())
+
+    def has_manifest(self, source_hash):
+        return os.path.exists(self.manifest_path(source_hash))
+
+    def write_manifest(self, source_hash, entries):
+        _write_atomic(self.manifest_path(source_hash), json.dumps(entries).encode())
+
+    def read_manifest(self, source_hash):
+        with open(self.manifest_path(source_hash)) as f:
+            return json.load(f)
+
+    def write_index(self, index):
+        _write_atomic(self.index_path(), json.dumps(index, indent=1).encode())
+
+    def read_index(self):
+        try:
+            with open(self.index_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+class ArtifactReader:
+    """
+    Read side of the store for the dataset version recorded in its index.
+    """
+
+    def __init__(self, store, index):
+        self.store = store
+        self.experiments = index["experiments"]  # Experiment -> source hash of its figures
+        self.tables = index["tables"]  # Source hash of the gene tables
+
+    @lru_cache(maxsize=128)
+    def _manifest(self, source_hash):
+        return self.store.read_manifest(source_hash)
+
+    def figure(self, experiment, gene, kind):
+        """
+        Pre-rendered modal figure, or None if it is not in the store.
+        """
+        source_hash = self.experiments.get(experiment)
+        if source_hash is None:
+            return None
+        digest = self._manifest(source_hash).get(gene, {}).get(kind, "")
+        if digest is None:
+            return {}  # Rendered, but the builder produced no figure
+        return self.store.get(digest) if digest else None
+
+    def table(self, gene):
+        """
+        Pre-rendered modal table of a gene as column lists, or None if it is not in the store.
+        """
+        if self.tables is None:
+            return None
+        digest = self._manifest(self.tables).get(gene)
+        return self.store.get(digest) if digest else None
+
+
+@lru_cache(maxsize=4)
+def _open_reader(root, index_version, sources):
+    store = ArtifactStore(root)
+    index = store.read_index()
+    # Only serve artifacts built from the data files currently on disk
+    if index is None or index.get("version") != ARTIFACT_VERSION:
+        return None
+    if [list(item) for item in sources] != index.get("sources"):
+        return None
+    return ArtifactReader(store, index)
+
+
+def get_reader(root=STORE_ROOT, sources=None):
+    """
+    Return a reader for the store, or None if it is missing or built from other data files.
+
+    Parameters:
+        root (str): Store directory.
+        sources (dict): Data file paths the artifacts must match (defaults to SOURCE_FILES).
+    """
+    sources = dataset_version(*(sources or SOURCE_FILES).values())
+    index_version = dataset_version(os.path.join(root, "index.json"))
+    if index_version[0][1] is None:
+        return None
+    return _open_reader(root, index_version, sources)
@@ -0,0 +1,178 @@
+import argparse
+import bisect
+import json
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; callers fall back to reading the CSV
+    pa = pc = pq = None
+
+# Rows per row group; each group covers a contiguous, sorted range of genes
+ROW_GROUP_ROWS = 512
+
+# Key of the experiment -> row groups index in the Parquet key-value metadata
+INDEX_METADATA_KEY = b"barseq.experiment_index"
+
+
+def columnar_path(csv_path):
+    """
+    Path of the Parquet file converted from a CSV (same name, .parquet extension).
+    """
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def is_available(csv_path):
+    """
+    Check whether an up-to-date columnar copy of the CSV can be read.
+
+    Parameters:
+        csv_path (str): Path to the source CSV file.
+
+    Returns:
+        bool: True if pyarrow is installed and the Parquet file is not older than the CSV.
+    """
+    parquet_path = columnar_path(csv_path)
+    if pq is None or not os.path.exists(parquet_path):
+        return False
+    return not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+
+
+def convert_csv(csv_path="data/temp.csv", parquet_path=None, row_group_rows=ROW_GROUP_ROWS):
+    """
+    Convert the per-experiment fitness CSV into a gene-sorted, row-grouped Parquet file.
+
+    Rows are sorted by gene (keeping the source order within a gene) so every row group
+    holds a contiguous gene range, which the row group min/max statistics expose for pruning. An index mapping
+    each experiment to the row groups that contain it is stored in the file metadata.
+
+    Parameters:
+        csv_path (str): Path to the source CSV file.
+        parquet_path (str): Output path (defaults to columnar_path(csv_path)).
+        row_group_rows (int): Number of rows per row group.
+
+    Returns:
+        str: Path of the written Parquet file.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required to convert to the columnar format.")
+    parquet_path = parquet_path or columnar_path(csv_path)
+
+    df = pd.read_csv(csv_path)
+    df = df.drop(columns=[col for col in df.columns if col.startswith("Unnamed")])
+    df = df.sort_values("gene", kind="mergesort").reset_index(drop=True)
+
+    # Experiment -> row groups index, from the row group each row lands in
+    row_group_ids = pd.Series(df.index // row_group_rows, index=df.index)
+    experiment_index = {
+        experiment: sorted(groups.unique().tolist())
+        for experiment, groups in row_group_ids.groupby(df["experiment"])
+    }
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[INDEX_METADATA_KEY] = json.dumps(experiment_index).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    pq.write_table(
+        table,
+        parquet_path,
+        row_group_size=row_group_rows,
+        use_dictionary=["gene", "experiment", "file"],
+        write_statistics=True,
+    )
+    return parquet_path
+
+
+class ColumnarReader:
+    """
+    Reader that loads only the row groups holding the requested genes and experiments.
+    """
+
+    def __init__(self, parquet_path):
+        self.parquet_file = pq.ParquetFile(parquet_path)
+        metadata = self.parquet_file.metadata
+        gene_column = self.parquet_file.schema_arrow.get_field_index("gene")
+
+        # Gene range of each row group, from the column statistics
+        self.group_min_genes = []
+        self.group_max_genes = []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(gene_column).statistics
+            self.group_min_genes.append(stats.min)
+            self.group_max_genes.append(stats.max)
+
+        index = (metadata.metadata or {}).get(INDEX_METADATA_KEY)
+        self.experiment_index = {key: set(value) for key, value in json.loads(index).items()} if index else None
+
+    def row_groups(self, genes, experiments=None):
+        """
+        Row groups that may contain any of the genes (and any of the experiments).
+        """
+        groups = set()
+        for gene in genes:
+            # Groups are sorted by gene, so the candidates form a contiguous run
+            start = bisect.bisect_left(self.group_max_genes, gene)
+            end = bisect.bisect_right(self.group_min_genes, gene)
+            groups.update(range(start, end))
+
+        if experiments is not None and self.experiment_index is not None:
+            experiment_groups = set()
+            for experiment in experiments:
+                experiment_groups |= self.experiment_index.get(experiment, set())
+            groups &= experiment_groups
+        return sorted(groups)
+
+    def read(self, genes, experiments=None, columns=None):
+        """
+        Read the rows of the given genes (optionally restricted to some experiments).
+
+        Parameters:
+            genes (iterable): Gene IDs to fetch.
+            experiments (iterable): Experiment names to keep (None for all).
+            columns (list): Columns to load (None for all).
+
+        Returns:
+            pandas.DataFrame: Matching rows, sorted by gene.
+        """
+        genes = sorted(set(genes))
+        experiments = sorted(set(experiments)) if experiments is not None else None
+        groups = self.row_groups(genes, experiments)
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + ["gene", "experiment"]))
+        if not groups:
+            table = self.parquet_file.schema_arrow.empty_table()
+            return (table.select(columns) if columns is not None else table).to_pandas()
+
+        table = self.parquet_file.read_row_groups(groups, columns=columns)
+        mask = pc.is_in(table["gene"], value_set=pa.array(genes, type=pa.string()))
+        if experiments is not None:
+            mask = pc.and_(mask, pc.is_in(table["experiment"], value_set=pa.array(experiments, type=pa.string())))
+        return table.filter(mask).to_pandas()
+
+
+@lru_cache(maxsize=4)
+def _open_reader(parquet_path, mtime_ns):
+    return ColumnarReader(parquet_path)
+
+
+def get_reader(csv_path="data/temp.csv"):
+    """
+    Return a reader for the columnar copy of a CSV, reopened when the file changes.
+    """
+    parquet_path = columnar_path(csv_path)
+    return _open_reader(parquet_path, os.stat(parquet_path).st_mtime_ns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the per-experiment fitness CSV to gene-sorted Parquet.")
+    parser.add_argument("csv_path", nargs="?", default="data/temp.csv")
+    parser.add_argument("--output", default=None, help="Parquet path (defaults to the CSV path with .parquet)")
+    parser.add_argument("--row-group-rows", type=int, default=ROW_GROUP_ROWS)
+    args = parser.parse_args()
+    print(convert_csv(args.csv_path, args.output, args.row_group_rows))
@@ -0,0 +1,93 @@
+import base64
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Significant digits kept for coordinates; well beyond the precision shown in hovers and axes
+DISPLAY_DIGITS = 4
+
+# Shorter arrays stay plain JSON lists, where base64 padding would not pay off
+MIN_TYPED_LENGTH = 8
+
+# Smallest plotly.js typed-array dtypes able to hold the data
+_INT_DTYPES = (("u1", np.uint8), ("i1", np.int8), ("u2", np.uint16), ("i2", np.int16), ("i4", np.int32))
+
+
+def round_significant(array, digits=DISPLAY_DIGITS):
+    """
+    Round a float array to a number of significant digits, leaving NaN and inf untouched.
+    """
+    finite = np.isfinite(array) & (array != 0)
+    magnitude = np.floor(np.log10(np.abs(array, where=finite, out=np.ones_like(array))))
+    scale = 10.0 ** (digits - 1 - magnitude)
+    return np.where(finite, np.round(array * scale) / scale, array)
+
+
+def encode_array(values, digits=DISPLAY_DIGITS):
+    """
+    Encode a numeric array in plotly.js base64 typed-array form.
+
+    Parameters:
+        values (array-like): Values of one trace attribute (e.g. x, y, marker.size).
+        digits (int): Significant digits kept for floating point values.
+
+    Returns:
+        dict or list or the input unchanged: {"dtype", "bdata"[, "shape"]} for numeric arrays,
+        a rounded list for short numeric arrays, and non-numeric values untouched.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf" or array.size == 0:
+        return values
+
+    if array.dtype.kind == "f":
+        array = round_significant(array.astype(np.float64), digits)
+        if array.size < MIN_TYPED_LENGTH:
+            return array.tolist()
+        dtype, array = "f4", array.astype(np.float32)
+    else:
+        if array.size < MIN_TYPED_LENGTH:
+            return array.tolist()
+        low, high = array.min(), array.max()
+        dtype, np_dtype = next(
+            ((name, np_type) for name, np_type in _INT_DTYPES
+             if np.iinfo(np_type).min <= low and high <= np.iinfo(np_type).max),
+            ("f8", np.float64),
+        )
+        array = array.astype(np_dtype)
+
+    encoded = {"dtype": dtype, "bdata": base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")}
+    if array.ndim > 1:
+        encoded["shape"] = ", ".join(str(n) for n in array.shape)
+    return encoded
+
+
+def _encode_node(node, digits):
+    """
+    Recursively encode numeric arrays inside a trace dictionary.
+    """
+    if isinstance(node, dict):
+        return {key: _encode_node(value, digits) for key, value in node.items()}
+    if isinstance(node, (list, tuple, np.ndarray)):
+        return encode_array(node, digits)
+    return node
+
+
+def encode_figure(fig, digits=DISPLAY_DIGITS):
+    """
+    Serialize a figure compactly for dcc.Graph.
+
+    Numeric trace columns are rounded to display precision and sent as base64 typed
+    arrays; per-point hover strings are expected to live in hovertemplates instead.
+
+    Parameters:
+        fig (plotly.graph_objs.Figure or dict): Figure to encode.
+        digits (int): Significant digits kept for floating point values.
+
+    Returns:
+        dict: Figure dictionary ready to be returned from a callback.
+    """
+    if fig is None:
+        return None
+    fig_dict = fig.to_dict() if isinstance(fig, go.Figure) else dict(fig)
+    fig_dict["data"] = [_encode_node(trace, digits) for trace in fig_dict.get("data", [])]
+    return fig_dict
@@ -0,0 +1,253 @@
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+# Array fields of an arrays.json entry, all shaped (mouse x day x id)
+ARRAY_FIELDS = (
+    "counts", "ratios", "ratiosvar", "absfitness", "absfitnessvar",
+    "controlarray", "controlvararray",
+)
+
+
+def to_float_array(values):
+    """
+    Convert a nested list from arrays.json into a float array, mapping "NA" to NaN.
+
+    Parameters:
+        values (list): Nested list of numbers and "NA" strings.
+
+    Returns:
+        numpy.ndarray: Float array with the same shape as the nested list.
+    """
+    array = np.array(values, dtype=object)
+    array[array == "NA"] = np.nan
+    return array.astype(float)
+
+
+def decode_experiment(raw_dict):
+    """
+    Decode one arrays.json entry into NumPy arrays.
+
+    Parameters:
+        raw_dict (dict): Dictionary as stored in arrays.json.
+
+    Returns:
+        dict: Same keys, with the array fields converted to float arrays.
+    """
+    decoded = dict(raw_dict)
+    for field in ARRAY_FIELDS:
+        if field in raw_dict:
+            decoded[field] = to_float_array(raw_dict[field])
+    decoded["input"] = to_float_array(raw_dict.get("input", []))
+    return decoded
+
+
+@lru_cache(maxsize=4)
+def load_experiment_arrays(json_file="data/arrays.json"):
+    """
+    Load and decode every experiment in arrays.json once per process.
+
+    Parameters:
+        json_file (str): Path to the JSON file containing the list of dictionaries.
+
+    Returns:
+        tuple: Decoded experiment dictionaries, in experiment order.
+    """
+    with open(json_file, "r") as f:
+        array_data = json.load(f)
+    return tuple(decode_experiment(entry) for entry in array_data)
+
+
+def select_gene(experiment, gene):
+    """
+    Slice an experiment down to a single gene, keeping the (mouse x day x id) layout.
+
+    Parameters:
+        experiment (dict): Decoded (or recomputed) experiment dictionary.
+        gene (str): Gene ID to keep.
+
+    Returns:
+        dict: Copy of the experiment whose per-gene arrays hold only that gene.
+    """
+    genes = list(experiment["genes"])
+    if gene not in genes:
+        raise ValueError(f"Gene '{gene}' not found in experiment.")
+    gene_index = genes.index(gene)
+
+    sliced = dict(experiment, genes=[gene])
+    for field in ("counts", "ratios", "ratiosvar", "absfitness", "absfitnessvar"):
+        if field in experiment:
+            sliced[field] = experiment[field][:, :, gene_index:gene_index + 1]
+    sliced["input"] = experiment["input"][gene_index:gene_index + 1]
+    return sliced
+
+# arrays.json stores 4 decimals, so a control variance of 0 is anything below this
+CONTROL_VARIANCE_FLOOR = 5e-5
+
+
+def control_normaliser(experiment, selected, n_steps):
+    """
+    Inverse-variance weighted mean of some control barcodes per mouse/day step.
+
+    Parameters:
+        experiment (dict): Decoded experiment dictionary.
+        selected (list): Indices of the controls in controlnames.
+        n_steps (int): Number of day-over-day steps.
+
+    Returns:
+        tuple: Normaliser and its variance, both (mouse x step).
+    """
+    control_fitness = experiment["controlarray"][:, :n_steps, selected]
+    control_variance = np.maximum(experiment["controlvararray"][:, :n_steps, selected], CONTROL_VARIANCE_FLOOR)
+    control_weights = 1 / control_variance
+    control_weights = np.where(np.isnan(control_fitness), np.nan, control_weights)
+    weight_sum = np.nansum(control_weights, axis=2)
+    normaliser = np.nansum(control_weights * control_fitness, axis=2) / weight_sum
+    return normaliser, 1 / weight_sum
+
+
+def recompute_fitness(experiment, controls=None):
+    """
+    Re-normalise abs fitness and its variance against a subset of control barcodes.
+
+    The stored absfitness is the day-over-day ratio change divided by the weighted mean
+    of all controls, so it is rescaled by old normaliser / new normaliser. In the stored
+    variance, the relative variance of the normaliser is swapped for that of the new one.
+    Ratios do not depend on the controls and are left as stored. All mice, days and genes
+    are computed in a single broadcast pass; with every control selected the stored
+    arrays are reproduced.
+
+    Parameters:
+        experiment (dict): Decoded experiment dictionary (see decode_experiment).
+        controls (iterable): Control barcode names to normalise against.
+            Defaults to every control in the experiment's controlnames.
+
+    Returns:
+        dict: Arrays "absfitness" and "absfitnessvar" (mouse x day x id), plus "genes"
+        and the "controlnames" actually used.
+    """
+    control_names = list(experiment["controlnames"])
+    if controls is None:
+        controls = control_names
+    selected = [i for i, name in enumerate(control_names) if name in set(controls)]
+    if not selected:
+        raise ValueError("At least one control barcode must be selected.")
+
+    absfitness = experiment["absfitness"]
+    absfitnessvar = experiment["absfitnessvar"]
+    n_steps = absfitness.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stored, stored_var = control_normaliser(experiment, list(range(len(control_names))), n_steps)
+        chosen, chosen_var = control_normaliser(experiment, selected, n_steps)
+
+        # Delta method: relative variances add, so swap the normaliser's term
+        # (written without dividing by absfitness, which can be 0)
+        scale = (stored / chosen)[..., None]
+        recomputed = absfitness * scale
+        recomputed_var = (
+            scale ** 2 * (absfitnessvar - absfitness ** 2 * (stored_var / stored ** 2)[..., None])
+            + recomputed ** 2 * (chosen_var / chosen ** 2)[..., None]
+        )
+
+    return {
+        "genes": experiment["genes"],
+        "controlnames": [control_names[i] for i in selected],
+        "absfitness": recomputed,
+        "absfitnessvar": recomputed_var,
+    }
+
+
+def summarise_fitness(absfitness, absfitnessvar):
+    """
+    Inverse-variance weighted mean of abs fitness over mice and days, per gene.
+
+    This is how the per-experiment fitness in temp.csv is derived from the arrays.
+
+    Returns:
+        tuple: Fitness and its variance, one value per gene.
+    """
+    valid = ~np.isnan(absfitness) & ~np.isnan(absfitnessvar) & (absfitnessvar > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(valid, 1 / absfitnessvar, 0.0)
+        weight_sum = weights.sum(axis=(0, 1))
+        fitness = (weights * np.where(valid, absfitness, 0.0)).sum(axis=(0, 1)) / weight_sum
+    return fitness, 1 / weight_sum
+
+
+# Shared pool for batch recomputes, created once rather than per call
+_RECOMPUTE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="recompute")
+
+
+def recompute_experiments(experiments, deselected=()):
+    """
+    Recompute fitness for several experiments in parallel, leaving out some controls.
+
+    Experiments have different control sets, so each one is re-normalised against its own
+    controls minus the deselected ones; experiments using none of them keep their stored
+    values. NumPy releases the GIL inside the array kernels, so a thread pool is enough to
+    spread experiments across cores without copying the arrays to worker processes.
+
+    Parameters:
+        experiments (iterable): Decoded experiment dictionaries.
+        deselected (iterable): Control barcode names to leave out.
+
+    Returns:
+        list: One recompute_fitness result per experiment, in input order (None where
+        no control of the experiment is deselected, or where all of them are).
+    """
+    deselected = set(deselected)
+
+    def _recompute(experiment):
+        control_names = list(experiment["controlnames"])
+        controls = [name for name in control_names if name not in deselected]
+        if len(controls) == len(control_names):
+            return None  # Every control of this experiment is selected: stored values apply
+        try:
+            return recompute_fitness(experiment, controls)
+        except ValueError:
+            return None
+
+    return list(_RECOMPUTE_POOL.map(_recompute, experiments))
+
+
+def check_recompute(experiments, rtol=1e-9):
+    """
+    Check that re-normalising against every control reproduces the stored arrays.
+
+    Parameters:
+        experiments (iterable): Decoded experiment dictionaries.
+        rtol (float): Relative tolerance.
+
+    Returns:
+        list: (experiment index, field, max relative error) for every mismatch.
+    """
+    mismatches = []
+    for index, experiment in enumerate(experiments):
+        if not len(experiment["controlnames"]):
+            continue  # Nothing to re-normalise against
+        recomputed = recompute_fitness(experiment)
+        for field in ("absfitness", "absfitnessvar"):
+            stored, new = experiment[field], recomputed[field]
+            if not np.array_equal(np.isnan(stored), np.isnan(new)):
+                mismatches.append((index, field, np.inf))
+                continue
+            with np.errstate(divide="ignore", invalid="ignore"):
+                error = np.nanmax(np.abs(new - stored) / np.abs(stored), initial=0.0)
+            if error > rtol:
+                mismatches.append((index, field, error))
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the control re-normalisation against arrays.json.")
+    parser.add_argument("json_file", nargs="?", default="data/arrays.json")
+    args = parser.parse_args()
+    problems = check_recompute(load_experiment_arrays(args.json_file))
+    for index, field, error in problems:
+        print(f"Experiment {index}: {field} differs by up to {error:.3g}")
+    print("OK" if not problems else f"{len(problems)} mismatches")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,107 @@
+import base64
+import re
+
+import pandas as pd
+
+from utils import columnar
+
+# Columns of the enriched gene-list table, in display order
+GENE_LIST_COLUMNS = ["query", "gene", "gene_name", "phenotype", "Relative.Growth.Rate", "Confidence", "experiments"]
+
+# Separators accepted between IDs in a pasted or uploaded list
+_ID_SEPARATORS = re.compile(r"[\s,;]+")
+
+
+def parse_gene_list(text):
+    """
+    Split pasted or uploaded text into unique gene IDs, keeping their order.
+
+    Parameters:
+        text (str): IDs separated by whitespace, commas or semicolons.
+
+    Returns:
+        list: Unique IDs.
+    """
+    if not text:
+        return []
+    return list(dict.fromkeys(token for token in _ID_SEPARATORS.split(text) if token))
+
+
+def decode_upload(contents):
+    """
+    Decode the data URL produced by dcc.Upload into text.
+    """
+    if not contents:
+        return ""
+    _, encoded = contents.split(",", 1)
+    return base64.b64decode(encoded).decode("utf-8", errors="ignore")
+
+
+def build_alias_index(data):
+    """
+    Build a case-insensitive alias -> gene index from the gene IDs and current_version_ID.
+
+    Parameters:
+        data (pandas.DataFrame): Phenotype dataset with "gene" and "current_version_ID".
+
+    Returns:
+        pandas.DataFrame: Columns "key" (upper-cased alias) and "gene", one row per alias.
+    """
+    genes = data["gene"].astype(object)  # Plain strings, also for categorical columns
+    aliases = pd.DataFrame({
+        "alias": data["current_version_ID"].astype(object).fillna("").str.split(";"),
+        "gene": genes,
+    }).explode("alias")
+
+    index = pd.concat([
+        pd.DataFrame({"alias": genes, "gene": genes}),  # Gene IDs take precedence
+        aliases,
+    ])
+    index["key"] = index["alias"].str.strip().str.upper()
+    index = index[index["key"] != ""]
+    return index.drop_duplicates("key")[["key", "gene"]].reset_index(drop=True)
+
+
+def experiment_coverage(file_path="data/temp.csv"):
+    """
+    Count the experiments in which each gene has a fitness estimate.
+
+    Returns:
+        pandas.Series: Number of experiments, indexed by gene.
+    """
+    columns = ["gene", "experiment", "fitness"]
+    if columnar.is_available(file_path):
+        df = columnar.get_reader(file_path).parquet_file.read(columns=columns).to_pandas()
+    else:
+        df = pd.read_csv(file_path, usecols=columns)
+    df = df[df["fitness"].notna()]
+    return df.groupby("gene")["experiment"].nunique().rename("experiments")
+
+
+def resolve_gene_list(ids, data, alias_index, coverage):
+    """
+    Resolve a list of gene IDs or aliases and enrich them with phenotype data.
+
+    All IDs are resolved in one merge against the alias index, followed by one merge
+    with the phenotype table and the experiment coverage.
+
+    Parameters:
+        ids (list): Gene IDs or current_version_ID aliases, as entered by the user.
+        data (pandas.DataFrame): Phenotype dataset.
+        alias_index (pandas.DataFrame): Output of build_alias_index.
+        coverage (pandas.Series): Output of experiment_coverage.
+
+    Returns:
+        pandas.DataFrame: One row per query with GENE_LIST_COLUMNS; unmatched queries
+        have an empty gene.
+    """
+    queries = pd.DataFrame({"query": pd.Series(ids, dtype=object)})
+    queries["key"] = queries["query"].str.strip().str.upper()
+
+    resolved = queries.merge(alias_index, on="key", how="left")
+    details = data[["gene", "gene_name", "phenotype", "Relative.Growth.Rate", "Confidence"]].drop_duplicates("gene")
+    details = details.astype({"gene": object})
+    resolved = resolved.merge(details, on="gene", how="left")
+    resolved = resolved.merge(coverage, left_on="gene", right_index=True, how="left")
+    resolved["experiments"] = resolved["experiments"].fillna(0).astype(int)
+    return resolved[GENE_LIST_COLUMNS]
@@ -1,31 +1,36 @@
-from dash import dash_table, dcc, html
+from dash import Patch, dash_table, dcc, html
+from dash.dash_table.Format import Format, Scheme
 import pandas as pd
-import json
 import plotly.express as px
 import numpy as np
 import plotly.graph_objects as go
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-
-# Load the dataset
-try:
-    data = pd.read_csv("data/Barseq20250124.csv")
-except FileNotFoundError:
-    data = pd.DataFrame(
-        {"gene": [], "Relative.Growth.Rate": [], "Confidence": [], "phenotype": []}
-    )
-    print("Warning: Dataset not found. Using an empty DataFrame.")
+from utils import artifacts, columnar
+from utils.figure_encoding import encode_figure
+from utils.fitness import (
+    load_experiment_arrays, recompute_experiments, recompute_fitness, select_gene, summarise_fitness,
+)
+from utils.singleflight import check_superseded, single_flight, wait_for
+from utils.snapshots import load_snapshots
 
 
-# Load the dataset
-try:
-    df = pd.read_csv("data/temp.csv")
-except FileNotFoundError:
-    print("Warning: Dataset not found. Using an empty DataFrame.")
+# Load the dataset (latest snapshot)
+data = load_snapshots().latest.data
 
 
 # Function to create a DataTable
 
 
+def table_records(data):
+    """
+    DataTable records of a snapshot, keyed by gene through the row "id".
+    """
+    return data.assign(id=data["gene"]).to_dict("records")
+
+
 def create_table():
     """
     Generates a Dash DataTable that displays all columns from the dataset.
@@ -35,7 +40,7 @@ def create_table():
         columns=[
             {"name": col, "id": col} for col in data.columns  # Include all columns dynamically
         ],
-        data=data.to_dict("records"),  # Convert DataFrame to records
+        data=table_records(data),  # Records keyed by gene via the row id
         page_size=20,  # Number of rows per page
         style_table={
             "overflowX": "auto",  # Enable horizontal scrolling
@@ -69,6 +74,23 @@ def create_table():
         ],
     )
 
+# Function to relabel table rows after a reclassification
+def relabel_table(positions, labels):
+    """
+    Patch the phenotype of some rows of the DataTable.
+
+    Parameters:
+        positions (iterable): Row positions of the genes whose phenotype changed.
+        labels (list): New phenotype of each of those genes.
+
+    Returns:
+        dash.Patch: Updates of the changed cells only.
+    """
+    patch = Patch()
+    for position, label in zip(positions, labels):
+        patch[position]["phenotype"] = label
+    return patch
+
 # Function to create download links
 def download_links():
     """
@@ -92,32 +114,30 @@ def send_data_frame(export_func, filename, **kwargs):
     return dcc.send_data_frame(export_func, filename, **kwargs)
 
 # Function to display selected gene details
-def get_selected_row_details(click_data, selected_rows, data):
+def get_selected_row_details(click_data, selected_row_ids, records):
     """
     Generate details of the selected row or clicked scatter plot point.
 
     Args:
         click_data: Data from scatter plot click event.
-        selected_rows: List of selected row indices from the DataTable.
-        data: DataFrame containing the dataset.
+        selected_row_ids: List of selected row ids (gene IDs) from the DataTable.
+        records: GeneRecordStore of the dataset.
 
     Returns:
         An HTML Div containing the gene details or a default message.
     """
+    gene = None
     # Handle scatter plot click event
     if click_data:
         point = click_data["points"][0]
         gene = point.get("customdata", [None])[0]  # Retrieve the custom data (gene)
-        if gene and gene in data["gene"].values:  # Ensure the gene exists in the data
-            row_data = data[data["gene"] == gene].iloc[0]
-            return _generate_gene_details(row_data)
-
     # Handle table row selection event
-    if selected_rows:
-        row_idx = selected_rows[0] if selected_rows else None
-        if row_idx is not None and row_idx < len(data):
-            row_data = data.iloc[row_idx]
-            return _generate_gene_details(row_data)
+    elif selected_row_ids:
+        gene = selected_row_ids[0]
+
+    details = records.get_details(gene) if gene else None
+    if details is not None:
+        return _generate_gene_details(details)
 
     # Default message when no selection is made
     return html.Div(
@@ -127,22 +147,22 @@ def get_selected_row_details(click_data, selected_rows, data):
         className="p-2 text-muted"
     )
 
-def _generate_gene_details(row_data):
+def _generate_gene_details(details):
     """
     Helper function to generate the HTML content for gene details.
 
     Args:
-        row_data: The row of the dataset corresponding to the selected gene.
+        details: GeneDetails tuple of the selected gene.
 
     Returns:
         An HTML Div containing the details of the gene.
     """
     return html.Div(
         [
-            html.P(f"Gene: {row_data['gene']}", className="font-weight-bold"),
-            html.P(f"Growth Rate: {row_data['Relative.Growth.Rate']:.2f}"),
-            html.P(f"Confidence: {row_data['Confidence']:.2f}"),
-            html.P(f"Phenotype: {row_data['phenotype']}"),
+            html.P(f"Gene: {details.gene}", className="font-weight-bold"),
+            html.P(f"Growth Rate: {details.growth_rate:.2f}"),
+            html.P(f"Confidence: {details.confidence:.2f}"),
+            html.P(f"Phenotype: {details.phenotype}"),
             html.Button(
                 "More Details",
                 id="more-details-button",
@@ -159,39 +179,51 @@ def _generate_gene_details(row_data):
 
 
 
-def get_gene_details_from_csv(gene_id, file_path="data/temp.csv"):
+def _read_gene_rows(gene_ids, experiments=None, file_path="data/temp.csv"):
     """
-    Read a CSV file and extract details for a specific gene.
+    Load the raw rows of some genes, from the columnar copy of the CSV when available.
+
+    The columnar reader only touches the row groups holding the requested genes, so the
+    cost follows the size of the answer rather than the size of the file.
+    """
+    if columnar.is_available(file_path):
+        return columnar.get_reader(file_path).read(gene_ids, experiments)
+
+    # Fall back to parsing the full CSV
+    df = pd.read_csv(file_path)
+    mask = df["gene"].isin(list(gene_ids))
+    if experiments is not None:
+        mask &= df["experiment"].isin(list(experiments))
+    return df[mask]
+
+
+@single_flight("genes_details", version_args=("file_path",))
+def get_genes_details_from_csv(gene_ids, experiments=None, file_path="data/temp.csv"):
+    """
+    Extract per-experiment details for a batch of genes.
+
     Parameters:
-        gene_id (str): The gene ID to filter.
+        gene_ids (list): The gene IDs to fetch.
+        experiments (list): Experiments to restrict to (None for all).
         file_path (str): The path to the CSV file.
+
     Returns:
-        tuple: A DataFrame with relevant columns (renamed and ordered) and the full DataFrame.
+        tuple: A DataFrame with the gene and relevant columns (renamed and ordered) and
+        the raw rows of the requested genes.
     """
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        # print("CSV File Loaded Successfully")  # Debug: Confirm file load
-        # print(f"Columns in CSV: {df.columns.tolist()}")  # Debug: Check CSV columns
-        # print(f"Gene ID to filter: {gene_id}")  # Debug: Confirm gene being searched
+        df = _read_gene_rows(gene_ids, experiments, file_path)
 
         # Ensure the 'fitness' column exists
         if "fitness" not in df.columns:
             raise KeyError("Column 'fitness' not found in the CSV file.")
 
-        # Filter the DataFrame for the specific gene and drop rows with NaN in 'fitness'
-        filtered_df = df[(df["gene"] == gene_id) & (df["fitness"].notna())]
-
-        # Reorder columns for display
-        if not filtered_df.empty:
-            filtered_df = filtered_df[["experiment", "fitness", "lower", "upper"]]
-            # Rename 'fitness' to 'Relative Growth Rate'
-            filtered_df = filtered_df.rename(columns={"fitness": "Relative Growth Rate"})
+        # Drop rows with NaN in 'fitness' and reorder columns for display
+        filtered_df = df[df["fitness"].notna()]
+        filtered_df = filtered_df[["gene", "experiment", "fitness", "lower", "upper"]]
+        # Rename 'fitness' to 'Relative Growth Rate'
+        filtered_df = filtered_df.rename(columns={"fitness": "Relative Growth Rate"})
 
-        # print(f"Filtered Data for Gene {gene_id}:")  # Debug: Check filtered data
-        # print(filtered_df)
-
-        # Return the filtered DataFrame and the full DataFrame
         return filtered_df, df
     except FileNotFoundError:
         print(f"File not found: {file_path}")
@@ -201,54 +233,293 @@ def get_gene_details_from_csv(gene_id, file_path="data/temp.csv"):
         raise KeyError(f"Missing column in CSV file: {e}")
 
 
+@single_flight("gene_details", version_args=("file_path",))
+def get_gene_details_from_csv(gene_id, file_path="data/temp.csv"):
+    """
+    Read a CSV file and extract details for a specific gene.
+    Parameters:
+        gene_id (str): The gene ID to filter.
+        file_path (str): The path to the CSV file.
+    Returns:
+        tuple: A DataFrame with relevant columns (renamed and ordered) and the gene's raw rows.
+    """
+    filtered_df, gene_df = get_genes_details_from_csv([gene_id], file_path=file_path)
+    if not filtered_df.empty:
+        filtered_df = filtered_df.drop(columns="gene")
+    return filtered_df, gene_df
+
+
+def get_modal_table(gene_id, file_path="data/temp.csv"):
+    """
+    Per-experiment table of a gene for the details modal.
+
+    Served from the artifact store when it was built from the current data files,
+    otherwise read from the CSV.
+
+    Returns:
+        pandas.DataFrame: experiment, Relative Growth Rate, lower and upper columns.
+    """
+    reader = artifacts.get_reader() if file_path == artifacts.SOURCE_FILES["csv_file"] else None
+    table = reader.table(gene_id) if reader is not None else None
+    if table is not None:
+        return pd.DataFrame(table)
+    filtered_df, _ = get_gene_details_from_csv(gene_id, file_path=file_path)
+    return filtered_df
+
+
+# Columns of the modal table; numbers are formatted by the DataTable on the client
+MODAL_TABLE_DECIMALS = 2
+MODAL_TABLE_COLUMNS = [{"name": "experiment", "id": "experiment"}] + [
+    {"name": col, "id": col, "type": "numeric", "format": Format(precision=MODAL_TABLE_DECIMALS, scheme=Scheme.fixed)}
+    for col in ["Relative Growth Rate", "lower", "upper"]
+] + [
+    # Filled in when the control selection is changed in the modal
+    {"name": "Selected controls", "id": "recomputed", "type": "numeric",
+     "format": Format(precision=MODAL_TABLE_DECIMALS, scheme=Scheme.fixed)},
+]
+
+
+def modal_table_records(table):
+    """
+    Convert a gene's per-experiment table into records for the modal DataTable.
+
+    Numeric columns are rounded to the displayed precision in one vectorized pass,
+    which keeps the payload small; the display formatting happens client-side.
+
+    Parameters:
+        table (pandas.DataFrame): Output of get_modal_table.
+
+    Returns:
+        list: DataTable records.
+    """
+    numeric = table.select_dtypes("number").columns
+    return table.round({col: MODAL_TABLE_DECIMALS for col in numeric}).to_dict("records")
+
+
+def snapshot_diff_columns(before, after):
+    """
+    DataTable columns of a snapshot comparison, named after the compared snapshots.
+    """
+    number = Format(precision=MODAL_TABLE_DECIMALS, scheme=Scheme.fixed)
+    signed = Format(precision=MODAL_TABLE_DECIMALS, scheme=Scheme.fixed).sign("+")
+    return [
+        {"name": "gene", "id": "gene"},
+        {"name": "gene_name", "id": "gene_name"},
+        {"name": "status", "id": "status"},
+        {"name": f"phenotype {before}", "id": "phenotype_before"},
+        {"name": f"phenotype {after}", "id": "phenotype_after"},
+        {"name": f"growth rate {before}", "id": "growth_before", "type": "numeric", "format": number},
+        {"name": f"growth rate {after}", "id": "growth_after", "type": "numeric", "format": number},
+        {"name": "shift", "id": "shift", "type": "numeric", "format": signed},
+    ]
+
+
+def snapshot_diff_records(rows):
+    """
+    Convert rows of a snapshot comparison into DataTable records.
+
+    As for the modal table, numbers are rounded to the displayed precision in one pass.
+    """
+    numeric = ["growth_before", "growth_after", "shift"]
+    return rows.round({col: MODAL_TABLE_DECIMALS for col in numeric}).to_dict("records")
+
+
+def get_experiment_index(selected_experiment, order_file="data/experiment_order.txt"):
+    """
+    Look up the position of an experiment in the experiment order file.
+
+    Parameters:
+        selected_experiment (str): The experiment name selected by the user.
+        order_file (str): Path to the experiment order file.
+
+    Returns:
+        int: Index of the experiment in arrays.json.
+    """
+    # Read the experiment order file and map experiments to their line index
+    with open(order_file, "r") as f:
+        experiment_order = {line.strip(): idx for idx, line in enumerate(f) if line.strip()}
 
+    if selected_experiment not in experiment_order:
+        raise ValueError(f"Experiment '{selected_experiment}' not found in {order_file}.")
+    return experiment_order[selected_experiment]
 
 
+@single_flight("experiment_controls", version_args=("order_file", "json_file"))
+def get_experiment_controls(selected_experiment, order_file="data/experiment_order.txt", json_file="data/arrays.json"):
+    """
+    List the control barcodes available for an experiment.
+
+    Returns:
+        list: Control barcode names, or an empty list if the experiment is unknown.
+    """
+    try:
+        selected_index = get_experiment_index(selected_experiment, order_file)
+        return list(load_experiment_arrays(json_file)[selected_index]["controlnames"])
+    except (ValueError, IndexError) as e:
+        print(f"Error: {e}")
+        return []
+
 
-def get_experiment_keys(selected_experiment, gene, order_file="data/experiment_order.txt", json_file="data/arrays.json"):
+@single_flight("experiment_keys", version_args=("order_file", "json_file"))
+def get_experiment_keys(selected_experiment, order_file="data/experiment_order.txt", json_file="data/arrays.json"):
     """
-    Fetch dictionary keys from arrays.json based on the selected experiment's index and plot data for a specific gene.
+    Fetch dictionary keys from arrays.json based on the selected experiment's index.
     
     Parameters:
         selected_experiment (str): The experiment name selected by the user.
-        gene (str): The gene name for plotting.
         order_file (str): Path to the experiment order file.
         json_file (str): Path to the JSON file containing the list of dictionaries.
         
     Returns:
         list: Keys of the dictionary at the selected experiment's index.
-        Plotly Figures: Ratios plot, Abs fitness plot, and Inverse variance plot.
     """
     try:
-        # Read the experiment order file and map experiments to their line index
-        with open(order_file, "r") as f:
-            experiment_order = {line.strip(): idx for idx, line in enumerate(f) if line.strip()}
-
-        # Get the index for the selected experiment
-        if selected_experiment not in experiment_order:
-            raise ValueError(f"Experiment '{selected_experiment}' not found in {order_file}.")
-        selected_index = experiment_order[selected_experiment]
-
-        # Load the JSON file
-        with open(json_file, "r") as f:
-            array_data = json.load(f)
-
-        # Get the dictionary at the specified index
-        if selected_index >= len(array_data):
-            raise IndexError(f"Index {selected_index} is out of range for {json_file}.")
-        selected_dict = array_data[selected_index]
-
-        # Create the plots
-        fig_ratios = create_ratios_plot(selected_dict, gene_name=gene)
-        fig_abs = create_abs_fitness_plot(selected_dict, gene_name=gene)
-        fig_inversevar = create_inversevar_plot(selected_dict, gene_name=gene)
-        
-        # Return the keys of the dictionary and the plots
-        return list(selected_dict.keys()), fig_ratios, fig_abs, fig_inversevar
-
-    except Exception as e:
+        selected_index = get_experiment_index(selected_experiment, order_file)
+        return list(load_experiment_arrays(json_file)[selected_index].keys())
+    except (ValueError, IndexError) as e:
         print(f"Error: {e}")
-        return [], {}, {}, {}
+        return []
+
+
+@single_flight("experiment_slice", version_args=("order_file", "json_file"))
+def load_experiment_slice(selected_experiment, gene, controls=None, order_file="data/experiment_order.txt", json_file="data/arrays.json"):
+    """
+    Build the decoded single-gene slice of an experiment shared by the modal figures.
+
+    Parameters:
+        selected_experiment (str): The experiment name selected by the user.
+        gene (str): The gene to slice out.
+        controls (list): Control barcodes to re-normalise against. When given, the stored
+            abs fitnesses and their variances are rescaled to the new normaliser.
+        order_file (str): Path to the experiment order file.
+        json_file (str): Path to the JSON file containing the list of dictionaries.
+
+    Returns:
+        dict: Experiment dictionary restricted to the gene.
+    """
+    # Get the index for the selected experiment
+    selected_index = get_experiment_index(selected_experiment, order_file)
+
+    # Load the decoded experiments (cached per process)
+    array_data = load_experiment_arrays(json_file)
+    if selected_index >= len(array_data):
+        raise IndexError(f"Index {selected_index} is out of range for {json_file}.")
+    selected_dict = array_data[selected_index]
+
+    selected_dict = select_gene(selected_dict, gene)
+
+    # Re-normalise against the chosen control barcodes; ratios do not depend on them
+    if controls is not None:
+        recomputed = recompute_fitness(selected_dict, controls)
+        selected_dict = dict(
+            selected_dict,
+            **{field: recomputed[field] for field in ("absfitness", "absfitnessvar")},
+        )
+
+    return selected_dict
+
+
+
+@single_flight("gene_recompute", version_args=("order_file", "json_file"))
+def recompute_gene_growth(gene, experiments, deselected, order_file="data/experiment_order.txt", json_file="data/arrays.json"):
+    """
+    Growth rate of a gene in several experiments, re-normalised without some control barcodes.
+
+    The gene is sliced out of each experiment first, so the batch only rescales a few
+    arrays per experiment; the rescaled fitnesses are then averaged over mice and days
+    with inverse-variance weights, as in temp.csv.
+
+    Parameters:
+        gene (str): The gene to recompute.
+        experiments (list): Experiment names.
+        deselected (list): Control barcode names to leave out; each experiment keeps the
+            rest of its own controls.
+        order_file (str): Path to the experiment order file.
+        json_file (str): Path to the JSON file containing the list of dictionaries.
+
+    Returns:
+        list: One growth rate per experiment, None where the stored one applies (no
+        control of the experiment is deselected) or it cannot be recomputed.
+    """
+    array_data = load_experiment_arrays(json_file)
+    slices = []
+    for experiment in experiments:
+        try:
+            slices.append(select_gene(array_data[get_experiment_index(experiment, order_file)], gene))
+        except (ValueError, IndexError):
+            slices.append(None)
+
+    # Stop here if the request was superseded while slicing (and nobody else waits)
+    check_superseded()
+    valid = [selected for selected in slices if selected is not None]
+    results = iter(recompute_experiments(valid, deselected))
+    growth_rates = []
+    for selected in slices:
+        result = next(results) if selected is not None else None
+        if result is None:
+            growth_rates.append(None)
+            continue
+        fitness, _ = summarise_fitness(result["absfitness"], result["absfitnessvar"])
+        growth_rates.append(float(fitness[0]) if np.isfinite(fitness[0]) else None)
+    return growth_rates
+
+
+# Bounded pool that builds the three modal figures side by side
+_MODAL_FIGURE_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="modal-figure")
+_MODAL_FIGURE_CACHE_SIZE = 32
+_modal_figure_futures = OrderedDict()
+_modal_figure_lock = threading.Lock()
+
+
+def get_modal_figure(kind, selected_experiment, gene, controls=None):
+    """
+    Return one of the modal figures for an experiment and gene.
+
+    The first request for an (experiment, gene, controls) combination submits all three
+    figures to the pool at once, so the callbacks for the other figures find theirs
+    already in progress and every figure is returned as soon as it is ready.
+
+    Parameters:
+        kind (str): One of MODAL_FIGURE_BUILDERS ("ratios", "abs", "inversevar").
+        selected_experiment (str): The experiment name selected by the user.
+        gene (str): The gene name for plotting.
+        controls (list): Control barcodes to re-normalise against (None for stored values).
+
+    Returns:
+        dict: Encoded Plotly figure, or an empty dict if it could not be built.
+    """
+    # Figures for the stored values are served pre-rendered when the warm-up job has run
+    if controls is None:
+        reader = artifacts.get_reader()
+        figure = reader.figure(selected_experiment, gene, kind) if reader is not None else None
+        if figure is not None:
+            return figure
+
+    key = (selected_experiment, gene, tuple(sorted(controls)) if controls is not None else None)
+    with _modal_figure_lock:
+        futures = _modal_figure_futures.get(key)
+        if futures is not None:
+            _modal_figure_futures.move_to_end(key)
+
+    if futures is None:
+        try:
+            selected_dict = load_experiment_slice(selected_experiment, gene, controls)
+        except Exception as e:
+            print(f"Error: {e}")
+            return {}
+
+        with _modal_figure_lock:
+            futures = _modal_figure_futures.get(key)
+            if futures is None:
+                futures = {
+                    name: _MODAL_FIGURE_POOL.submit(builder, selected_dict, gene_name=gene)
+                    for name, builder in MODAL_FIGURE_BUILDERS.items()
+                }
+                _modal_figure_futures[key] = futures
+                if len(_modal_figure_futures) > _MODAL_FIGURE_CACHE_SIZE:
+                    _modal_figure_futures.popitem(last=False)
+
+    return wait_for(futures[kind]) or {}
 
 
 
@@ -263,7 +534,7 @@ def create_ratios_plot(selected_dict, gene_name="Selected Gene"):
         gene_name (str): Name of the gene for the plot title.
     
     Returns:
-        plotly.graph_objs._figure.Figure: Plotly figure object.
+        dict: Encoded Plotly figure (see utils.figure_encoding.encode_figure).
     """
     try:
         # Extract ratios and ratiovar from the dictionary
@@ -278,7 +549,7 @@ def create_ratios_plot(selected_dict, gene_name="Selected Gene"):
         num_days = ratios_array.shape[1]
         day_columns = [f"day{i+1}" for i in range(num_days)]
 
-        # Extract data for the first id (similar to the R function)
+        # Extract data for the gene (the experiment slice holds a single id)
         ratios = pd.DataFrame(ratios_array[:, :, 0], columns=day_columns)
         ratiovar = pd.DataFrame(ratiovar_array[:, :, 0], columns=day_columns)
 
@@ -328,7 +599,8 @@ def create_ratios_plot(selected_dict, gene_name="Selected Gene"):
                 mode="markers+lines",
                 marker=dict(color=custom_colors.get(mouse, "black")),  # Default to black if mouse index exceeds 2
                 line=dict(color=custom_colors.get(mouse, "black")),
-                name=f"Mouse {mouse + 1}"  # Mouse numbers start from 1
+                name=f"Mouse {mouse + 1}",  # Mouse numbers start from 1
+                hovertemplate="Day %{x}<br>Abundance %{y:.2%}",
             ))
 
         # Format layout
@@ -340,7 +612,7 @@ def create_ratios_plot(selected_dict, gene_name="Selected Gene"):
             showlegend=True
         )
 
-        return fig
+        return encode_figure(fig)
 
     except Exception as e:
         print(f"Error creating ratios plot: {e}")
@@ -356,7 +628,7 @@ def create_abs_fitness_plot(selected_dict, gene_name="Selected Gene"):
         gene_name (str): Name of the gene for the plot title.
     
     Returns:
-        plotly.graph_objs._figure.Figure: Plotly figure object.
+        dict: Encoded Plotly figure (see utils.figure_encoding.encode_figure).
     """
     try:
         # Extract absfitness from the dictionary
@@ -370,7 +642,7 @@ def create_abs_fitness_plot(selected_dict, gene_name="Selected Gene"):
         num_days = abs_array.shape[1]
         day_columns = [f"day{i+1}" for i in range(num_days)]
 
-        # Extract data for the first id (similar to the R function)
+        # Extract data for the gene (the experiment slice holds a single id)
         abs_df = pd.DataFrame(abs_array[:, :, 0], columns=day_columns)
 
         # Melt data to long format (mouse, day, absfitness)
@@ -404,6 +676,7 @@ def create_abs_fitness_plot(selected_dict, gene_name="Selected Gene"):
                 x=mouse_data["day"],
                 y=mouse_data["abs"],
                 name=f"Mouse {mouse + 1}",
+                hovertemplate="Day %{x}<br>Growth rate %{y:.2f}",
                 marker=dict(color=custom_colors.get(mouse, "gray")),
             ))
 
@@ -427,7 +700,7 @@ def create_abs_fitness_plot(selected_dict, gene_name="Selected Gene"):
             barmode="group",  # Group bars for each mouse
         )
 
-        return fig
+        return encode_figure(fig)
 
     except Exception as e:
         print(f"Error creating abs fitness plot: {e}")
@@ -442,7 +715,7 @@ def create_inversevar_plot(selected_dict, gene_name="Selected Gene"):
         gene_name (str): Name of the gene for the plot title.
     
     Returns:
-        plotly.graph_objs._figure.Figure: Plotly figure object.
+        dict: Encoded Plotly figure (see utils.figure_encoding.encode_figure).
     """
     try:
         # Extract absfitnessvar from the dictionary
@@ -456,7 +729,7 @@ def create_inversevar_plot(selected_dict, gene_name="Selected Gene"):
         num_days = absvar_array.shape[1]
         day_columns = [f"day{i+1}" for i in range(num_days)]
 
-        # Extract data for the first id (similar to the R function)
+        # Extract data for the gene (the experiment slice holds a single id)
         absvar_df = pd.DataFrame(absvar_array[:, :, 0], columns=day_columns)
 
         # Melt data to long format (mouse, day, absfitnessvar)
@@ -493,6 +766,7 @@ def create_inversevar_plot(selected_dict, gene_name="Selected Gene"):
                 x=mouse_data["day"],
                 y=mouse_data["inversevar"],
                 name=f"Mouse {mouse + 1}",
+                hovertemplate="Day %{x}<br>Weight %{y:.2f}",
                 marker=dict(color=custom_colors.get(mouse, "gray")),
             ))
 
@@ -506,8 +780,16 @@ def create_inversevar_plot(selected_dict, gene_name="Selected Gene"):
             barmode="group",  # Group bars for each mouse
         )
 
-        return fig
+        return encode_figure(fig)
 
     except Exception as e:
         print(f"Error creating inverse variance plot: {e}")
         return None
+
+
+# Modal figure builders, keyed by the suffix of their dcc.Graph id ("modal-figure-<kind>")
+MODAL_FIGURE_BUILDERS = {
+    "ratios": create_ratios_plot,
+    "abs": create_abs_fitness_plot,
+    "inversevar": create_inversevar_plot,
+}
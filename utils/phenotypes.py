@@ -0,0 +1,101 @@
+import numpy as np
+
+# Phenotype calls, in legend order; classifications are stored as indices into this list
+PHENOTYPES = ["Slow", "Essential", "Dispensable", "Insufficient data", "Fast"]
+SLOW, ESSENTIAL, DISPENSABLE, INSUFFICIENT, FAST = range(len(PHENOTYPES))
+
+# Default thresholds; they reproduce about 97% of the published calls
+DEFAULT_THRESHOLDS = {
+    "essential_max": 0.1,  # Essential when the lower confidence bound is below this
+    "dispensable_min": 0.99,  # Dispensable when the upper confidence bound reaches this
+    "fast_min": 1.0,  # Fast when the lower confidence bound is above this
+    "min_confidence": 0.0,  # Insufficient data below this confidence
+}
+
+
+def classify_phenotypes(growth_rate, lower, upper, confidence, essential_max, dispensable_min, fast_min,
+                        min_confidence):
+    """
+    Call phenotypes for all genes at once from their growth rate confidence intervals.
+
+    Rules, first match wins:
+        no growth rate, or confidence below min_confidence   -> Insufficient data
+        lower > fast_min                                     -> Fast
+        lower < essential_max and upper >= dispensable_min   -> Insufficient data (interval spans both)
+        upper >= dispensable_min                             -> Dispensable
+        lower < essential_max, or no lower bound             -> Essential
+        otherwise                                            -> Slow
+
+    Parameters:
+        growth_rate, lower, upper, confidence (numpy.ndarray): Per-gene values (NaN if missing).
+        essential_max, dispensable_min, fast_min, min_confidence (float): Thresholds.
+
+    Returns:
+        numpy.ndarray: Indices into PHENOTYPES (int8).
+    """
+    conditions = [
+        np.isnan(growth_rate) | (confidence < min_confidence),
+        lower > fast_min,
+        (lower < essential_max) & (upper >= dispensable_min),
+        upper >= dispensable_min,
+        (lower < essential_max) | np.isnan(lower),
+    ]
+    choices = [INSUFFICIENT, FAST, INSUFFICIENT, DISPENSABLE, ESSENTIAL]
+    return np.select(conditions, choices, default=SLOW).astype(np.int8)
+
+
+def phenotype_codes(labels):
+    """
+    Indices into PHENOTYPES of some phenotype labels; unknown labels count as insufficient data.
+
+    Returns:
+        numpy.ndarray: Phenotype codes (int8).
+    """
+    codes = {phenotype: code for code, phenotype in enumerate(PHENOTYPES)}
+    return np.array([codes.get(phenotype, INSUFFICIENT) for phenotype in labels], dtype=np.int8)
+
+
+class PhenotypeClassifier:
+    """
+    Reclassify the genes of one version of the phenotype dataset under different thresholds.
+
+    The columns are extracted once as float arrays, so a reclassification is a handful of
+    vectorized comparisons over the whole genome.
+    """
+
+    def __init__(self, data):
+        self.growth_rate = data["Relative.Growth.Rate"].to_numpy(dtype=float)
+        self.lower = data["lower"].to_numpy(dtype=float)
+        self.upper = data["upper"].to_numpy(dtype=float)
+        self.confidence = data["Confidence"].to_numpy(dtype=float)
+
+        # Published calls
+        self.published = phenotype_codes(data["phenotype"])
+
+    def classify(self, thresholds=None):
+        """
+        Phenotype codes under some thresholds, or the published calls for None.
+
+        Parameters:
+            thresholds (dict): Keys of DEFAULT_THRESHOLDS; missing keys take the defaults.
+        """
+        if thresholds is None:
+            return self.published
+        return classify_phenotypes(
+            self.growth_rate, self.lower, self.upper, self.confidence,
+            **{**DEFAULT_THRESHOLDS, **thresholds},
+        )
+
+    @staticmethod
+    def changed(previous, current):
+        """
+        Row positions whose call differs between two classifications.
+        """
+        return np.flatnonzero(previous != current)
+
+    @staticmethod
+    def counts(codes):
+        """
+        Number of genes per phenotype, in PHENOTYPES order.
+        """
+        return np.bincount(codes, minlength=len(PHENOTYPES)).tolist()
@@ -0,0 +1,38 @@
+from collections import namedtuple
+
+# Fields shown in the details panels, pre-extracted per gene
+GeneDetails = namedtuple("GeneDetails", ["gene", "growth_rate", "confidence", "phenotype"])
+
+
+class GeneRecordStore:
+    """
+    Gene-keyed lookup over one version of the phenotype dataset.
+
+    Built once per dataset, it maps each gene to a pre-extracted details tuple, so every
+    selection (search, plot click, table row id) resolves with a dictionary lookup
+    instead of scanning the gene column.
+    """
+
+    def __init__(self, data):
+        genes = data["gene"].tolist()
+        # First occurrence wins if a gene is listed twice
+        positions = {}
+        for position, gene in enumerate(genes):
+            positions.setdefault(gene, position)
+
+        growth_rates = data["Relative.Growth.Rate"].tolist()
+        confidences = data["Confidence"].tolist()
+        phenotypes = data["phenotype"].tolist()
+        self.details = {
+            gene: GeneDetails(gene, growth_rates[position], confidences[position], phenotypes[position])
+            for gene, position in positions.items()
+        }
+
+    def __contains__(self, gene):
+        return gene in self.details
+
+    def get_details(self, gene):
+        """
+        Details tuple of a gene, or None if it is unknown.
+        """
+        return self.details.get(gene)
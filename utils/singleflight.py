@@ -0,0 +1,253 @@
+import contextvars
+import functools
+import inspect
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+from dash.exceptions import PreventUpdate
+
+# How often waiting requests check whether they have been superseded (seconds)
+POLL_INTERVAL = 0.05
+
+# Cancellation check of the request running in the current context, if any
+_current_ticket = contextvars.ContextVar("single_flight_ticket", default=None)
+
+
+class Superseded(Exception):
+    """Raised in a request that a newer request from the same session has replaced."""
+
+
+def dataset_version(*paths):
+    """
+    Identify the on-disk version of one or more data files.
+
+    Parameters:
+        paths (str): Paths of the data files an operation reads.
+
+    Returns:
+        tuple: (path, modification time, size) for each file; None for missing files.
+    """
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+        except (OSError, TypeError):
+            version.append((path, None, None))
+    return tuple(version)
+
+
+def _freeze(value):
+    """
+    Turn call arguments into a hashable key.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(item) for item in value))
+    return value
+
+
+class _Call:
+    def __init__(self, owner):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.owner = owner  # Cancellation check of the leader's request, if any
+        self.waiters = 0  # Other callers waiting for the result
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: one caller computes, the others wait for its result.
+    """
+
+    def __init__(self):
+        # Reentrant: cancellation checks of nested flights go through their outer flights
+        self._lock = threading.RLock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless an identical call (same key) is already in flight.
+
+        A waiting caller gives up as soon as its own request is superseded. The caller
+        computing the result (the leader) is only stopped at the check_superseded() calls
+        made inside fn (e.g. in wait_for), and only when its request is superseded while
+        no other caller waits for the result; otherwise it runs to completion.
+
+        Returns:
+            The shared result of the computation. Results are shared between callers,
+            so they must be treated as read-only.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(_current_ticket.get())
+            else:
+                call.waiters += 1
+
+        if leader:
+            token = _current_ticket.set((self, (key, call)))
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                _current_ticket.reset(token)
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                call.done.set()
+        else:
+            try:
+                while not call.done.wait(POLL_INTERVAL):
+                    check_superseded()
+            finally:
+                with self._lock:
+                    call.waiters -= 1
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def is_superseded(self, ticket):
+        """
+        Whether the computation of a leader can be abandoned: its request was superseded
+        and no other caller waits for the result.
+        """
+        key, call = ticket
+        with self._lock:
+            if call.waiters or call.owner is None:
+                return False
+            tracker, owner_ticket = call.owner
+            if not tracker.is_superseded(owner_ticket):
+                return False
+            # Later identical calls start a fresh computation instead of joining this one
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            return True
+
+
+class SessionTracker:
+    """
+    Track the latest request per (session, operation) so older ones can be abandoned.
+
+    Only keys with a request in flight are kept: a key is dropped when its last request
+    ends, so the tracker does not grow with the number of sessions ever seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generations = {}  # (session, operation) -> [latest generation, requests in flight]
+
+    def begin(self, session_id, operation):
+        """
+        Register a new request, superseding earlier ones for the same session and operation.
+        """
+        key = (session_id, operation)
+        with self._lock:
+            entry = self._generations.setdefault(key, [0, 0])
+            entry[0] += 1
+            entry[1] += 1
+            return key, entry[0]
+
+    def end(self, ticket):
+        """
+        Unregister a request, dropping its key once no request for it is in flight.
+        """
+        key, _ = ticket
+        with self._lock:
+            entry = self._generations[key]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._generations[key]
+
+    def is_superseded(self, ticket):
+        key, generation = ticket
+        with self._lock:
+            entry = self._generations.get(key)
+            return entry is None or entry[0] != generation
+
+    @contextmanager
+    def request(self, session_id, operation):
+        """
+        Run a callback body as the latest request of its session for this operation.
+
+        Once a newer request from the same session arrives, waits inside single-flight
+        calls are abandoned and the callback ends with PreventUpdate, freeing the worker
+        thread instead of finishing work whose result would be discarded.
+        """
+        if not session_id:
+            yield
+            return
+        ticket = self.begin(session_id, operation)
+        token = _current_ticket.set((self, ticket))
+        try:
+            yield
+            # A result computed for a superseded request would only overwrite a newer one
+            check_superseded()
+        except Superseded:
+            raise PreventUpdate
+        finally:
+            _current_ticket.reset(token)
+            self.end(ticket)
+
+
+def check_superseded():
+    """
+    Raise Superseded if the request running in this context has been replaced.
+    """
+    current = _current_ticket.get()
+    if current is not None:
+        tracker, ticket = current
+        if tracker.is_superseded(ticket):
+            raise Superseded()
+
+
+def wait_for(future):
+    """
+    Wait for a future, giving up early if the current request is superseded.
+    """
+    while True:
+        try:
+            return future.result(timeout=POLL_INTERVAL)
+        except FutureTimeoutError:
+            check_superseded()
+
+
+# Shared instances used by the data-access helpers and the callbacks
+flights = SingleFlight()
+sessions = SessionTracker()
+
+
+def single_flight(operation, version_args=()):
+    """
+    Decorator coalescing identical in-flight calls of a data-access helper.
+
+    Calls are keyed by (dataset version, operation, arguments), where the dataset version
+    is taken from the arguments naming the files the helper reads.
+
+    Parameters:
+        operation (str): Name of the operation, part of the coalescing key.
+        version_args (tuple): Names of the arguments holding data file paths.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            version = dataset_version(*(bound.arguments[name] for name in version_args))
+            key = (version, operation, _freeze(bound.arguments))
+            return flights.do(key, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
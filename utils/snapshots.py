@@ -0,0 +1,163 @@
+import glob
+import os
+import re
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.genelist import build_alias_index
+from utils.phenotypes import PhenotypeClassifier
+from utils.records import GeneRecordStore
+
+# Dated releases of the phenotype dataset, e.g. data/Barseq20250124.csv
+SNAPSHOT_PATTERN = "data/Barseq*.csv"
+
+# String columns stored as categoricals over one dictionary shared by all snapshots
+SHARED_COLUMNS = ["gene", "gene_name", "gene_product", "current_version_ID", "phenotype"]
+
+# Columns of the empty dataset used when no snapshot is found
+EMPTY_COLUMNS = ["gene", "gene_name", "gene_product", "current_version_ID", "Relative.Growth.Rate",
+                 "lower", "upper", "Confidence", "phenotype"]
+
+# Columns of a snapshot comparison, one row per gene present in either snapshot
+DIFF_COLUMNS = ["gene", "gene_name", "status", "phenotype_before", "phenotype_after",
+                "growth_before", "growth_after", "shift"]
+
+
+def snapshot_label(path):
+    """
+    Label of a snapshot file: its release date (YYYY-MM-DD) if the name holds one.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    match = re.search(r"(\d{4})(\d{2})(\d{2})", name)
+    return "-".join(match.groups()) if match else name
+
+
+class Snapshot:
+    """
+    One release of the phenotype dataset, with its lookup structures built on first use.
+    """
+
+    def __init__(self, label, path, data):
+        self.label = label
+        self.path = path
+        self.data = data
+
+    @cached_property
+    def records(self):
+        return GeneRecordStore(self.data)
+
+    @cached_property
+    def classifier(self):
+        return PhenotypeClassifier(self.data)
+
+    @cached_property
+    def alias_index(self):
+        return build_alias_index(self.data)
+
+
+class SnapshotRegistry:
+    """
+    Several snapshots loaded side by side, sharing their string dictionaries.
+
+    Gene IDs, names, products, aliases and phenotype labels repeat across releases, so
+    each of these columns is stored as a categorical whose categories (the union over all
+    snapshots) are one shared Index: every snapshot only holds integer codes. Shared
+    categories also make the gene codes of two snapshots directly comparable.
+    """
+
+    def __init__(self, paths):
+        frames = [(snapshot_label(path), path, pd.read_csv(path)) for path in paths]
+        frames.sort(key=lambda item: item[0])
+
+        self.dictionaries = {}
+        for column in SHARED_COLUMNS:
+            values = [frame[column].dropna().unique() for _, _, frame in frames if column in frame]
+            if values:
+                categories = pd.Index(np.unique(np.concatenate(values).astype(str)))
+                self.dictionaries[column] = pd.CategoricalDtype(categories)
+
+        self.snapshots = OrderedDict()
+        for label, path, frame in frames:
+            for column, dtype in self.dictionaries.items():
+                if column in frame:
+                    values = frame[column]
+                    frame[column] = values.where(values.isna(), values.astype(str)).astype(dtype)
+            self.snapshots[label] = Snapshot(label, path, frame)
+
+    @property
+    def labels(self):
+        return list(self.snapshots)
+
+    @property
+    def latest(self):
+        return next(reversed(self.snapshots.values()))
+
+    def get(self, label):
+        """
+        Snapshot with a label, or the latest one for an unknown label.
+        """
+        return self.snapshots.get(label) or self.latest
+
+    @lru_cache(maxsize=16)
+    def diff(self, label_before, label_after):
+        """
+        Compare two snapshots gene by gene.
+
+        Both snapshots are aligned on the shared gene codes, so the phenotype changes and
+        growth-rate shifts of all genes come from a few vectorized operations. Results
+        are cached per pair.
+
+        Returns:
+            pandas.DataFrame: DIFF_COLUMNS, with status "added", "removed",
+            "phenotype changed" or "unchanged".
+        """
+        def aligned(label):
+            data = self.get(label).data.drop_duplicates("gene")
+            return data.set_index(data["gene"].cat.codes)
+
+        before, after = aligned(label_before), aligned(label_after)
+        codes = before.index.union(after.index)
+        in_before = codes.isin(before.index)
+        in_after = codes.isin(after.index)
+        before, after = before.reindex(codes), after.reindex(codes)
+
+        phenotype_before = before["phenotype"].cat.codes.to_numpy()
+        phenotype_after = after["phenotype"].cat.codes.to_numpy()
+        status = np.select(
+            [~in_before, ~in_after, phenotype_before != phenotype_after],
+            ["added", "removed", "phenotype changed"],
+            default="unchanged",
+        )
+
+        genes = self.dictionaries["gene"].categories
+        return pd.DataFrame({
+            "gene": genes[codes],
+            "gene_name": after["gene_name"].fillna(before["gene_name"]).to_numpy(),
+            "status": status,
+            "phenotype_before": before["phenotype"].to_numpy(),
+            "phenotype_after": after["phenotype"].to_numpy(),
+            "growth_before": before["Relative.Growth.Rate"].to_numpy(),
+            "growth_after": after["Relative.Growth.Rate"].to_numpy(),
+            "shift": (after["Relative.Growth.Rate"] - before["Relative.Growth.Rate"]).to_numpy(),
+        })[DIFF_COLUMNS]
+
+
+@lru_cache(maxsize=1)
+def load_snapshots(pattern=SNAPSHOT_PATTERN):
+    """
+    Load every snapshot matching a glob pattern (cached per process).
+
+    Returns:
+        SnapshotRegistry: Snapshots ordered by label; an empty dataset if none is found.
+    """
+    paths = sorted(glob.glob(pattern))
+    if paths:
+        return SnapshotRegistry(paths)
+
+    print("Warning: Dataset not found. Using an empty DataFrame.")
+    registry = SnapshotRegistry([])
+    registry.snapshots["none"] = Snapshot("none", None, pd.DataFrame({col: [] for col in EMPTY_COLUMNS}))
+    return registry
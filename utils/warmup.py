@@ -0,0 +1,147 @@
+"""
+Pre-render the modal figures and tables of every gene into the artifact store.
+
+Figures are rendered for every (gene, experiment) pair with a fitness estimate in
+temp.csv, one experiment per process-pool task. Each experiment is addressed by the
+hash of its arrays.json entry and gene list, so a rerun only renders experiments whose
+source data changed; the tables are rebuilt when temp.csv changes.
+
+Example:
+    python -m utils.warmup --workers 4
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from utils.artifacts import ARTIFACT_VERSION, SOURCE_FILES, STORE_ROOT, ArtifactStore, content_hash
+from utils.helpers import MODAL_FIGURE_BUILDERS, load_experiment_slice
+from utils.singleflight import dataset_version
+
+# Columns of the modal table, as shown in the details modal
+TABLE_COLUMNS = ["experiment", "fitness", "lower", "upper"]
+
+
+def load_fitness_rows(csv_file):
+    """
+    Rows of the per-experiment fitness table that have a fitness estimate.
+    """
+    df = pd.read_csv(csv_file, usecols=["gene"] + TABLE_COLUMNS)
+    return df[df["fitness"].notna()]
+
+
+def _render_experiment(root, experiment, genes, json_file, order_file):
+    """
+    Render and store the modal figures of some genes in one experiment (process-pool task).
+
+    Returns:
+        tuple: The experiment and its manifest, mapping gene -> figure kind -> content hash
+        (None where the builder produced no figure).
+    """
+    store = ArtifactStore(root)
+    entries = {}
+    for gene in genes:
+        try:
+            selected_dict = load_experiment_slice(experiment, gene, order_file=order_file, json_file=json_file)
+        except (ValueError, IndexError) as e:
+            print(f"Skipping {gene} in {experiment}: {e}")
+            continue
+        entries[gene] = {}
+        for kind, builder in MODAL_FIGURE_BUILDERS.items():
+            figure = builder(selected_dict, gene_name=gene)
+            entries[gene][kind] = store.put(figure) if figure else None
+    return experiment, entries
+
+
+def build_tables(store, rows, source_hash):
+    """
+    Store the modal table of every gene as column lists and write their manifest.
+    """
+    table = rows[["gene"] + TABLE_COLUMNS].rename(columns={"fitness": "Relative Growth Rate"})
+    entries = {
+        gene: store.put(group.drop(columns="gene").to_dict("list"))
+        for gene, group in table.groupby("gene", sort=False)
+    }
+    store.write_manifest(source_hash, entries)
+    return len(entries)
+
+
+def warm_up(root=STORE_ROOT, json_file=SOURCE_FILES["json_file"], order_file=SOURCE_FILES["order_file"],
+            csv_file=SOURCE_FILES["csv_file"], max_workers=None):
+    """
+    Bring the artifact store up to date with the data files.
+
+    Parameters:
+        root (str): Store directory.
+        json_file (str): Path to arrays.json.
+        order_file (str): Path to the experiment order file.
+        csv_file (str): Path to the per-experiment fitness CSV.
+        max_workers (int): Worker processes (defaults to the number of CPUs).
+
+    Returns:
+        dict: Number of experiments rendered and reused, and of gene tables written.
+    """
+    store = ArtifactStore(root)
+    # Recorded before reading, so a file changed during the run invalidates the index
+    sources = dataset_version(json_file, order_file, csv_file)
+
+    with open(order_file) as f:
+        experiment_order = {line.strip(): idx for idx, line in enumerate(f) if line.strip()}
+    with open(json_file) as f:
+        raw_experiments = json.load(f)
+    rows = load_fitness_rows(csv_file)
+
+    # Source hash of each experiment: its raw arrays and the genes rendered from it
+    experiments = {}
+    pending = {}
+    for experiment, genes in rows.groupby("experiment", sort=True)["gene"]:
+        index = experiment_order.get(experiment)
+        if index is None or index >= len(raw_experiments):
+            print(f"Skipping {experiment}: not found in {order_file}.")
+            continue
+        genes = sorted(genes.unique())
+        source_hash = content_hash(
+            ARTIFACT_VERSION, experiment, json.dumps(raw_experiments[index], sort_keys=True), *genes
+        )
+        experiments[experiment] = source_hash
+        if not store.has_manifest(source_hash):
+            pending[experiment] = genes
+
+    start = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_render_experiment, root, experiment, genes, json_file, order_file)
+                for experiment, genes in pending.items()
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                experiment, entries = future.result()
+                store.write_manifest(experiments[experiment], entries)
+                print(f"[{done}/{len(pending)}] {experiment}: {len(entries)} genes "
+                      f"({time.perf_counter() - start:.0f}s)")
+
+    with open(csv_file, "rb") as f:
+        tables_hash = content_hash(ARTIFACT_VERSION, "tables", f.read())
+    tables = 0
+    if not store.has_manifest(tables_hash):
+        tables = build_tables(store, rows, tables_hash)
+
+    store.write_index({
+        "version": ARTIFACT_VERSION,
+        "sources": sources,
+        "experiments": experiments,
+        "tables": tables_hash,
+    })
+    return {"rendered": len(pending), "reused": len(experiments) - len(pending), "tables": tables}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=STORE_ROOT, help="Artifact store directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to the CPU count)")
+    args = parser.parse_args()
+    summary = warm_up(args.root, max_workers=args.workers)
+    print(f"Rendered {summary['rendered']} experiments, reused {summary['reused']}, "
+          f"wrote {summary['tables']} gene tables.")